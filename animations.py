@@ -1,6 +1,18 @@
 from manim import *
+import numpy as np
+import os
 import random
 
+from door_factory import make_door, make_door_label, make_glyph
+from exact import probabilities
+from sweep import SweepStore
+from trial_trace import TraceReader, write_trace
+
+import profiling
+
+# No-op unless MONTY_PROFILE is set (see profiling.py)
+profiling.install_from_env()
+
 class MontyHallSimulation(Scene):
     def construct(self):
 
@@ -18,7 +30,7 @@ class MontyHallSimulation(Scene):
         doors = VGroup()
 
         for pos in door_positions:
-            door = Rectangle(height=4, width=2, color=WHITE, fill_color=BLUE_C, fill_opacity=1).scale(0.8)  # brown closed door
+            door = make_door(height=4, width=2, scale=0.8)  # brown closed door
             door.move_to(RIGHT * pos)
             doors.add(door)  
 
@@ -26,11 +38,7 @@ class MontyHallSimulation(Scene):
         number_labels = VGroup()
 
         for i, door in enumerate(doors):
-            circle = Circle(radius=0.3, color=WHITE, fill_color=WHITE, fill_opacity=1)
-            num = Text(str(i+1), color=BLACK, font_size=32)
-            circle.move_to(door.get_center())
-            num.move_to(circle.get_center())
-            group = VGroup(circle, num)
+            group = make_door_label(i+1, font_size=32).move_to(door.get_center())
             number_labels.add(group)
 
         # Animate doors and labels appearing
@@ -119,9 +127,95 @@ class MontyHallSimulation(Scene):
         self.wait(0.5)
 
 
+class MontyHallTraceSimulation(Scene):
+    # Animates real simulated games: streams a trace written by
+    #   python trial_trace.py write monty.trace --doors 3 --trials 1e8
+    # and shows the running switch vs stay win rates as a live histogram.
+    # Each frame samples the trace at one (geometrically spaced) trial count,
+    # so render time depends on RUN_TIME, not on the size of the trace.
+    IN_FULL_VIDEO = False
+    TRACE_FILE = "monty.trace"
+    RUN_TIME = 8
+
+    def construct(self):
+        # Without a trace, simulate a small reproducible one under the media directory
+        trace_file = self.TRACE_FILE
+        if not os.path.exists(trace_file):
+            trace_file = os.path.join(config.media_dir, "traces", "sample.trace")
+            if not os.path.exists(trace_file):
+                os.makedirs(os.path.dirname(trace_file), exist_ok=True)
+                write_trace(trace_file, doors=3, trials=10**6, seed=0)
+
+        reader = TraceReader(trace_file)
+        N = reader.doors
+
+        # Title
+        title = Tex(r"\textbf{Simulated Games}", color=WHITE).scale(1.2)
+        self.play(Write(title))
+        self.wait(1)
+        self.play(title.animate.to_edge(UP))
+        self.wait(0.5)
+
+        axes = Axes(
+            x_range=[0, 3, 1],
+            y_range=[0, 1.1, 0.1],
+            x_length=6,
+            y_length=5,
+            axis_config={"color": WHITE},
+            x_axis_config={"include_ticks": False},
+            y_axis_config={"include_numbers": True, "numbers_to_include": [0, 0.5, 1]},
+            tips=False
+        ).move_to(DOWN * 0.5)
+        self.play(Create(axes))
+
+        # Exact win rates when Monty opens one goat door
+        exact = {"Switch": (N - 1) / (N * (N - 2)), "Stay": 1 / N}
+        tracker = ValueTracker(0)
+
+        def current_trial():
+            return int(round(reader.trials ** tracker.get_value()))
+
+        def rate(name):
+            switch_rate, stay_rate = reader.rates_at(current_trial())
+            return switch_rate if name == "Switch" else stay_rate
+
+        bars = VGroup()
+        decorations = VGroup()
+        for x, name, color in ((1, "Switch", YELLOW), (2, "Stay", GREEN)):
+            base = axes.c2p(x, 0)
+            bar = Rectangle(width=1.2, height=0.001, color=color, fill_color=color, fill_opacity=0.8, stroke_width=0)
+            bar.move_to(base, aligned_edge=DOWN)
+
+            def update_bar(b, name=name, base=base):
+                height = axes.c2p(0, rate(name))[1] - axes.c2p(0, 0)[1]
+                b.stretch_to_fit_height(max(height, 0.001))
+                b.move_to(base, aligned_edge=DOWN)
+
+            bar.add_updater(update_bar)
+            bars.add(bar)
+
+            expected = DashedLine(axes.c2p(x - 0.6, exact[name]), axes.c2p(x + 0.6, exact[name]), color=WHITE)
+            value = DecimalNumber(0, num_decimal_places=4, font_size=30, color=color)
+            value.add_updater(lambda m, name=name, bar=bar: m.set_value(rate(name)).next_to(bar, UP, buff=0.15))
+            label = Tex(name, font_size=36, color=color).next_to(base, DOWN, buff=0.3)
+            decorations.add(expected, value, label)
+
+        counter = VGroup(Tex("Trials:", font_size=36), Integer(1, font_size=36)).arrange(RIGHT)
+        counter.next_to(axes, RIGHT, buff=0.5)
+        counter[1].add_updater(lambda m: m.set_value(current_trial()))
+
+        self.add(bars)
+        self.play(FadeIn(decorations), FadeIn(counter))
+        self.play(tracker.animate.set_value(1), run_time=self.RUN_TIME, rate_func=linear)
+        self.wait(2)
+
+
 import math
 
 class MontyHallGeneralized(Scene):
+    # Encoded in one ffmpeg session instead of one partial file per play (stream_writer.py)
+    SINGLE_STREAM = True
+
     def construct(self):
 
         N = 40 # You can change this to 10, 20, 50, 100...
@@ -142,7 +236,7 @@ class MontyHallGeneralized(Scene):
             row = idx // n_cols
             col = idx % n_cols
 
-            door = Rectangle(height=1, width=0.6, color=WHITE, fill_color=BLUE_C, fill_opacity=1)
+            door = make_door(height=1, width=0.6)
 
             # Compute position
             x_offset = (col - (n_cols - 1) / 2) * 0.9
@@ -150,10 +244,7 @@ class MontyHallGeneralized(Scene):
             door.move_to(RIGHT * x_offset + UP * y_offset)
 
             # Add number circle inside door
-            circle = Circle(radius=0.15, color=WHITE, fill_color=WHITE, fill_opacity=1)
-            num = Text(str(idx+1), color=BLACK, font_size=18)
-            circle.move_to(door.get_center())
-            num.move_to(circle.get_center())
+            circle, num = make_door_label(idx+1, font_size=18, radius=0.15).move_to(door.get_center())
 
             group = VGroup(door, circle, num)
             doors.add(group)
@@ -177,15 +268,11 @@ class Classic3DoorVersion(Scene):
         number_labels = VGroup()
 
         for i, pos in enumerate(door_positions):
-            door = Rectangle(height=4, width=2, color=WHITE, fill_color=BLUE_C, fill_opacity=1).scale(0.8)
+            door = make_door(height=4, width=2, scale=0.8)
             door.move_to(RIGHT * pos)
             doors.add(door)
 
-            circle = Circle(radius=0.3, color=WHITE, fill_color=WHITE, fill_opacity=1)
-            num = Text(str(i+1), color=BLACK, font_size=36)
-            circle.move_to(door.get_center())
-            num.move_to(circle.get_center())
-            number_labels.add(VGroup(circle, num))
+            number_labels.add(make_door_label(i+1, font_size=36).move_to(door.get_center()))
 
         self.play(Create(doors), FadeIn(number_labels))
         self.wait(1)
@@ -237,16 +324,11 @@ class GeneralizedMontyHallN(Scene):
         doors_initial_label = VGroup()
 
         for idx, pos in enumerate(door_positions):
-            door = Rectangle(height=3, width=1.5, color=WHITE, fill_color=BLUE_C, fill_opacity=1).scale(0.6)
+            door = make_door(height=3, width=1.5, scale=0.6)
             door.move_to(RIGHT * pos)
 
-            circle = Circle(radius=0.3, color=WHITE, fill_color=WHITE, fill_opacity=1)
-            num = Text(str(idx+1), color=BLACK, font_size=32)
-            circle.move_to(door.get_center())
-            num.move_to(circle.get_center())
-
             doors_initial.add(door)
-            doors_initial_label.add(VGroup(circle, num))
+            doors_initial_label.add(make_door_label(idx+1, font_size=32).move_to(door.get_center()))
 
         self.play(LaggedStart(*[FadeIn(door) for door in VGroup(doors_initial, doors_initial_label)], lag_ratio=0.3))
         self.wait(0.5)
@@ -267,16 +349,11 @@ class GeneralizedMontyHallN(Scene):
         final_labels = ["N-2", "N-1", "N"]
 
         for label, pos in zip(final_labels, final_positions):
-            door = Rectangle(height=3, width=1.5, color=WHITE, fill_color=BLUE_C, fill_opacity=1).scale(0.6)
+            door = make_door(height=3, width=1.5, scale=0.6)
             door.move_to(RIGHT * pos)
 
-            circle = Circle(radius=0.3, color=WHITE, fill_color=WHITE, fill_opacity=1)
-            num = Text(label, color=BLACK, font_size=26)
-            circle.move_to(door.get_center())
-            num.move_to(circle.get_center())
-
             doors_final.add(door)
-            doors_final_labels.add(VGroup(circle, num))
+            doors_final_labels.add(make_door_label(label, font_size=26).move_to(door.get_center()))
 
         self.play(LaggedStart(*[FadeIn(door) for door in VGroup(doors_final, doors_final_labels)], lag_ratio=0.3))
         self.wait(0.5)
@@ -306,8 +383,11 @@ class GeneralizedMontyHallN(Scene):
         self.wait(2)
 
 class GeneralizedMontyHall(Scene):
+    N = 10  # You can set any N here
+    SINGLE_STREAM = True
+
     def construct(self):
-        N = 10  # You can set any N here
+        N = self.N
 
         # Title
         title = Tex(r"\textbf{Generalized Version}", color=WHITE).scale(1.2)
@@ -318,7 +398,7 @@ class GeneralizedMontyHall(Scene):
 
         # Create doors in grid
         doors, door_rects = self.create_doors_grid(N)
-        self.play(LaggedStart(*[FadeIn(door) for door in doors], lag_ratio=0.03))
+        self.show_doors(doors)
         self.wait(1)
 
         # Assume player picks first door (index 0)
@@ -341,8 +421,7 @@ class GeneralizedMontyHall(Scene):
         unopened_index = 1  # Assume one remaining door is index 1 (can be randomized)
         to_open = [i for i in range(N) if i != player_pick and i != unopened_index]
 
-        for i in to_open:
-            self.play(door_rects[i].animate.set_fill(opacity=0.2), run_time=0.3)
+        self.open_doors([door_rects[i] for i in to_open])
 
         self.wait(1)
 
@@ -366,18 +445,13 @@ class GeneralizedMontyHall(Scene):
             row = idx // n_cols
             col = idx % n_cols
 
-            door = Rectangle(height=1, width=0.6, color=WHITE, fill_color=BLUE_C, fill_opacity=1).scale(1.5)
+            door = make_door(height=1, width=0.6, scale=1.5)
 
             x_offset = (col - (n_cols - 1) / 2)*1.2
             y_offset = ((n_rows - 1) / 2 - row) * 1.4
             door.move_to(RIGHT * x_offset + UP * y_offset)
 
-            circle = Circle(radius=0.15, color=WHITE, fill_color=WHITE, fill_opacity=1)
-            num = Text(str(idx+1), color=BLACK, font_size=18)
-            circle.move_to(door.get_center())
-            num.move_to(circle.get_center())
-
-            label_group = VGroup(circle, num)
+            label_group = make_door_label(idx+1, font_size=18, radius=0.15).move_to(door.get_center())
             doors.add(VGroup(door, label_group))
             door_rects.append(door)
 
@@ -388,6 +462,82 @@ class GeneralizedMontyHall(Scene):
         self.play(door.animate.set_color(YELLOW))
         self.wait(0.5)
 
+    def show_doors(self, doors):
+        self.play(LaggedStart(*[FadeIn(door) for door in doors], lag_ratio=0.03))
+
+    # One animation per door
+    def open_doors(self, rects):
+        for rect in rects:
+            self.play(rect.animate.set_fill(opacity=0.2), run_time=0.3)
+
+class GeneralizedMontyHallLarge(GeneralizedMontyHall):
+    # Same story as GeneralizedMontyHall for N = 1,000 to 10,000 doors: doors
+    # are copied from one template, labels are assembled from ten cached digit
+    # glyphs, and doors appear and open in one animation each
+    IN_FULL_VIDEO = False
+    N = 1000
+    MIN_LABEL_CELL = 0.2  # grid cells smaller than this get no door numbers
+    OPEN_RUN_TIME = 3
+
+    def create_doors_grid(self, N):
+        doors = VGroup()
+        door_rects = []
+
+        # Fit the grid below the title, keeping the 0.6 x 1 door proportions
+        area_width, area_height = config.frame_width - 1, config.frame_height - 2
+        n_cols = max(1, math.ceil(math.sqrt(N * area_width / area_height * 1.6)))
+        n_rows = math.ceil(N / n_cols)
+        cell = min(area_width / n_cols, area_height / n_rows)
+
+        template = Rectangle(height=cell * 0.8, width=cell * 0.48, color=WHITE, fill_color=BLUE_C, fill_opacity=1, stroke_width=1)
+
+        # Ten glyphs are rasterized once and copied into every label
+        label_height = cell * 0.3
+        digits = None
+        if cell >= self.MIN_LABEL_CELL:
+            digits = [make_glyph(d).set(height=label_height) for d in range(10)]
+
+        for idx in range(N):
+            row = idx // n_cols
+            col = idx % n_cols
+
+            door = template.copy()
+            x_offset = (col - (n_cols - 1) / 2) * cell
+            y_offset = ((n_rows - 1) / 2 - row) * cell - 0.5
+            door.move_to(RIGHT * x_offset + UP * y_offset)
+
+            group = VGroup(door)
+            if digits is not None:
+                label = VGroup(*[digits[int(c)].copy() for c in str(idx + 1)]).arrange(RIGHT, buff=label_height * 0.08)
+                label.set(width=min(label.width, door.width * 0.9)).move_to(door)
+                group.add(label)
+
+            doors.add(group)
+            door_rects.append(door)
+
+        return doors, door_rects
+
+    def show_doors(self, doors):
+        self.play(FadeIn(doors))
+
+    # All doors open in one animation. Each door fades during its own short
+    # slice of the run time, giving a LaggedStart-like wave; only doors whose
+    # slice overlaps the current frame are touched.
+    def open_doors(self, rects):
+        group = VGroup(*rects)
+        fade = 0.05
+        starts = np.arange(len(rects)) / max(len(rects), 1) * (1 - fade)
+        state = {"done": 0}
+
+        def update(mob, alpha):
+            active_end = np.searchsorted(starts, alpha, side="left")
+            for i in range(state["done"], active_end):
+                t = min((alpha - starts[i]) / fade, 1)
+                mob[i].set_fill(opacity=1 - 0.8 * t)
+            state["done"] = np.searchsorted(starts, alpha - fade, side="right")
+
+        self.play(UpdateFromAlphaFunc(group, update), run_time=self.OPEN_RUN_TIME)
+
 class GeneralizedMontyHall100(Scene):
     def construct(self):
         # Title
@@ -404,16 +554,11 @@ class GeneralizedMontyHall100(Scene):
         doors_initial_label = VGroup()
 
         for idx, pos in enumerate(door_positions):
-            door = Rectangle(height=3, width=1.5, color=WHITE, fill_color=BLUE_C, fill_opacity=1).scale(0.6)
+            door = make_door(height=3, width=1.5, scale=0.6)
             door.move_to(RIGHT * pos)
 
-            circle = Circle(radius=0.3, color=WHITE, fill_color=WHITE, fill_opacity=1)
-            num = Text(str(idx+1), color=BLACK, font_size=32)
-            circle.move_to(door.get_center())
-            num.move_to(circle.get_center())
-
             doors_initial.add(door)
-            doors_initial_label.add(VGroup(circle, num))
+            doors_initial_label.add(make_door_label(idx+1, font_size=32).move_to(door.get_center()))
 
         self.play(LaggedStart(*[FadeIn(door) for door in VGroup(doors_initial, doors_initial_label)], lag_ratio=0.3))
 
@@ -432,16 +577,11 @@ class GeneralizedMontyHall100(Scene):
         final_labels = ["98", "99", "100"]
 
         for label, pos in zip(final_labels, final_positions):
-            door = Rectangle(height=3, width=1.5, color=WHITE, fill_color=BLUE_C, fill_opacity=1).scale(0.6)
+            door = make_door(height=3, width=1.5, scale=0.6)
             door.move_to(RIGHT * pos)
 
-            circle = Circle(radius=0.3, color=WHITE, fill_color=WHITE, fill_opacity=1)
-            num = Text(label, color=BLACK, font_size=26)
-            circle.move_to(door.get_center())
-            num.move_to(circle.get_center())
-
             doors_final.add(door)
-            doors_final_labels.add(VGroup(circle,num))
+            doors_final_labels.add(make_door_label(label, font_size=26).move_to(door.get_center()))
 
         self.play(LaggedStart(*[FadeIn(door) for door in VGroup(doors_final, doors_final_labels)], lag_ratio=0.3))
         self.wait(0.5)
@@ -471,6 +611,10 @@ class GeneralizedMontyHall100(Scene):
         self.wait(2)
 
 class ProbabilityVsN(Scene):
+    # Simulated points written by sweep.py are drawn next to the formula
+    SWEEP_STORE = "sweep_store"
+    SINGLE_STREAM = True
+
     def construct(self):
         # Title
         title = Tex(r"\textbf{Probability of Winning vs Number of Doors}", color=WHITE).scale(1.2)
@@ -504,13 +648,15 @@ class ProbabilityVsN(Scene):
         dots = VGroup()
 
         for N in range(3, 101):
-            prob = (N - 1) / N
+            # Host opens every other door but one, as in runInteractiveGame
+            exact = probabilities(N, opened=N - 2).switch
+            prob = float(exact)
             dot = Dot(point=axes.c2p(N, prob), color=YELLOW, radius=0.05)
             dots.add(dot)
 
             # Replace formula dynamically
             new_formula = Tex(
-                rf"$P(\text{{switch}}) = \frac{{{N-1}}}{{{N}}} = {prob:.2f}$",
+                rf"$P(\text{{switch}}) = \frac{{{exact.numerator}}}{{{exact.denominator}}} = {prob:.2f}$",
                 font_size=48, color=WHITE
             ).to_edge(UP).shift(DOWN * 0.5)
 
@@ -521,12 +667,107 @@ class ProbabilityVsN(Scene):
 
         self.wait(1)
 
+        # Empirical switch win rates, only if a sweep has stored some
+        sim_doors, sim_rates = SweepStore(self.SWEEP_STORE).win_rates(switch=True, all_but_one=True)
+        shown = (sim_doors >= 3) & (sim_doors <= 100)
+        if shown.any():
+            sim_dots = VGroup(*[
+                Dot(point=axes.c2p(n, p), color=RED, radius=0.06).set_fill(opacity=0).set_stroke(RED, width=2)
+                for n, p in zip(sim_doors[shown], sim_rates[shown])
+            ])
+            sim_label = Tex("simulated", font_size=30, color=RED).next_to(axes.c2p(100, 0.2), LEFT)
+            self.play(FadeIn(sim_dots), FadeIn(sim_label))
+            self.wait(1)
+
         # Final asymptote line at y=1
         line = DashedLine(start=axes.c2p(0, 1), end=axes.c2p(110, 1), color=BLUE)
         label1 = Tex("1", font_size=30, color=WHITE).next_to(line, LEFT, buff=0.2)
         self.play(Create(line), FadeIn(label1))
         self.wait(2)
 
+class ProbabilityVsNSweep(Scene):
+    # Same curve as ProbabilityVsN, driven by one ValueTracker and drawn in a
+    # single animation, so render time depends on frames rather than on N_MAX
+    IN_FULL_VIDEO = False
+    N_MAX = 10_000
+    SAMPLES = 1500
+
+    def construct(self):
+        # Title
+        title = Tex(r"\textbf{Probability of Winning vs Number of Doors}", color=WHITE).scale(1.2)
+        self.play(Write(title))
+        self.wait(2)
+        self.play(title.animate.to_edge(UP))
+        self.wait(0.5)
+
+        # Log-scaled N axis so 3 to N_MAX fits on screen
+        x_max = math.log10(self.N_MAX) + 0.1
+        axes = Axes(
+            x_range=[0, x_max, 1],
+            y_range=[0, 1.1, 0.1],
+            x_length=10,
+            y_length=5,
+            axis_config={"color": WHITE},
+            x_axis_config={"scaling": LogBase(custom_labels=True), "include_numbers": True},
+            tips=False
+        ).move_to(DOWN)
+
+        x_label = axes.get_x_axis_label(r"N", edge=RIGHT, direction=DOWN, buff=0.4)
+        y_label = axes.get_y_axis_label(r"P(\text{win if switch})", edge=UP, direction=LEFT, buff=0.4)
+
+        self.play(Create(axes), FadeIn(x_label, y_label))
+        self.wait(1)
+
+        # Formula is compiled once; the numbers below it update every frame
+        formula = Tex(r"$P(\text{switch}) = \frac{N-1}{N}$", font_size=48, color=WHITE).to_edge(UP).shift(DOWN * 0.5)
+        self.play(FadeIn(formula))
+        self.wait(1)
+
+        # Precompute the curve once. N is sampled geometrically (every integer
+        # at small N), so the curve never holds more than SAMPLES points.
+        ns = np.unique(np.round(np.geomspace(3, self.N_MAX, self.SAMPLES)).astype(int))
+
+        def p_switch(n):
+            return float(probabilities(int(n), opened=int(n) - 2).switch)
+
+        points = np.array([axes.c2p(n, p_switch(n)) for n in ns])
+
+        # The tracker holds log10(N) so the sweep moves evenly along the axis
+        tracker = ValueTracker(math.log10(3))
+
+        def current_n():
+            return int(round(10 ** tracker.get_value()))
+
+        def update_curve(curve):
+            k = max(np.searchsorted(ns, current_n(), side="right"), 2)
+            curve.set_points_as_corners(points[:k])
+
+        curve = VMobject(color=YELLOW, stroke_width=4)
+        curve.add_updater(update_curve)
+
+        head = Dot(color=YELLOW, radius=0.06)
+        head.add_updater(lambda d: d.move_to(axes.c2p(current_n(), p_switch(current_n()))))
+
+        n_value = Integer(3, font_size=36, color=WHITE)
+        p_value = DecimalNumber(2 / 3, num_decimal_places=4, font_size=36, color=YELLOW)
+        readout = VGroup(
+            VGroup(MathTex("N =", font_size=36), n_value).arrange(RIGHT),
+            VGroup(MathTex("P =", font_size=36), p_value).arrange(RIGHT),
+        ).arrange(DOWN, aligned_edge=LEFT).move_to(axes.c2p(300, 0.35))
+        n_value.add_updater(lambda m: m.set_value(current_n()))
+        p_value.add_updater(lambda m: m.set_value(p_switch(current_n())))
+
+        self.add(curve, head)
+        self.play(FadeIn(readout), run_time=0.4)
+        self.play(tracker.animate.set_value(math.log10(self.N_MAX)), run_time=8, rate_func=linear)
+        self.wait(1)
+
+        # Final asymptote line at y=1
+        line = DashedLine(start=axes.c2p(1, 1), end=axes.c2p(10 ** x_max, 1), color=BLUE)
+        label1 = Tex("1", font_size=30, color=WHITE).next_to(line, LEFT, buff=0.2)
+        self.play(Create(line), FadeIn(label1))
+        self.wait(2)
+
 class MarilynScene(Scene):
     def construct(self):
         # Quote (using flushleft for paragraph-style text)
@@ -574,15 +815,11 @@ class MontyAdam(Scene):
         number_labels = VGroup()
 
         for i, pos in enumerate(door_positions):
-            door = Rectangle(height=4, width=2, color=WHITE, fill_color=BLUE_C, fill_opacity=1).scale(0.8)
+            door = make_door(height=4, width=2, scale=0.8)
             door.move_to(RIGHT * pos)
             doors.add(door)
 
-            circle = Circle(radius=0.3, color=WHITE, fill_color=WHITE, fill_opacity=1)
-            num = Text(str(i+1), color=BLACK, font_size=36)
-            circle.move_to(door.get_center())
-            num.move_to(circle.get_center())
-            number_labels.add(VGroup(circle, num))
+            number_labels.add(make_door_label(i+1, font_size=36).move_to(door.get_center()))
 
         self.play(Create(doors), FadeIn(number_labels))
         self.wait(1)
@@ -0,0 +1,379 @@
+"""
+Benchmarks for the batch simulation engine and the animation scenes.
+
+    python bench.py engine           # trials/sec by doors, trials and workers
+    python bench.py scenes           # per-scene construct/Tex/Text/render/write time (needs manim)
+    python bench.py service          # service.py throughput and tail latency under load
+    python bench.py compare          # flag regressions against bench_baseline.json
+    python bench.py doors            # trials/sec from N=3 to N=10^7 doors
+    python bench.py grid             # per-door vs batched door grid (needs manim)
+    python bench.py strategies       # strategy plugins: one call per trial vs per chunk
+
+engine, scenes and service merge their results into bench_results.json; pass
+--save-baseline to also store them as the baseline to compare against.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from runner import run_sharded
+from simulation import simulate
+
+ROOT = Path(__file__).resolve().parent
+RESULTS_FILE = ROOT / "bench_results.json"
+BASELINE_FILE = ROOT / "bench_baseline.json"
+DEFAULT_THRESHOLD = 0.10
+
+# Metrics where a larger value is an improvement; everything else is a duration
+HIGHER_IS_BETTER = {"trials_per_sec", "req_per_sec"}
+
+# Durations shorter than this are too noisy to compare
+MIN_COMPARED_SECONDS = 0.05
+# Same for the service latencies, which are reported in milliseconds
+MIN_COMPARED_MS = 5.0
+
+DOOR_COUNTS = [3, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+
+def time_simulation(doors, trials, opened=1, repeat=3):
+    """Best-of-`repeat` trials/sec for `trials` rounds per strategy."""
+    best = float("inf")
+    for i in range(repeat):
+        start = time.perf_counter()
+        simulate(doors, trials, seed=i, opened=opened)
+        best = min(best, time.perf_counter() - start)
+    return 2 * trials / best
+
+
+def bench_doors(trials, door_counts=DOOR_COUNTS):
+    # Host opens one door (playSingleSimulation) and all but one (runInteractiveGame)
+    print(f"{'doors':>10} {'open 1 (M/s)':>14} {'open N-2 (M/s)':>16}")
+    for doors in door_counts:
+        one = time_simulation(doors, trials, opened=1)
+        all_but_one = time_simulation(doors, trials, opened=doors - 2)
+        print(f"{doors:>10} {one / 1e6:>14.2f} {all_but_one / 1e6:>16.2f}")
+
+
+def time_grid_scene(scene_class, doors):
+    """Render a door-grid scene without encoding; return (seconds, plays, peak MiB)."""
+    from manim import tempconfig
+
+    scene_class = type(scene_class.__name__, (scene_class,), {"N": doors})
+    tracemalloc.start()
+    start = time.perf_counter()
+    with tempconfig({"quality": "low_quality", "write_to_movie": False, "disable_caching": True}):
+        scene = scene_class()
+        scene.render()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return seconds, scene.renderer.num_plays, peak
+
+
+def bench_grid(door_counts, max_per_door):
+    from animations import GeneralizedMontyHall, GeneralizedMontyHallLarge
+
+    print(f"{'doors':>7} {'path':<10} {'seconds':>9} {'plays':>7} {'peak MiB':>9}")
+    for doors in door_counts:
+        for path, scene_class in (("per-door", GeneralizedMontyHall), ("batched", GeneralizedMontyHallLarge)):
+            if path == "per-door" and doors > max_per_door:
+                print(f"{doors:>7} {path:<10} {'skipped':>9}")
+                continue
+            seconds, plays, peak = time_grid_scene(scene_class, doors)
+            print(f"{doors:>7} {path:<10} {seconds:>9.1f} {plays:>7} {peak:>9.1f}")
+
+
+def bench_strategies(trials, chunk_sizes, specs):
+    """trials/sec of strategy plugins as the rounds per strategy call grow.
+
+    A chunk size of 1 is one Python call per round, the cost a per-trial
+    plugin API would pay; larger chunks show that cost amortized away.
+    """
+    from strategies import evaluate, load_strategy
+
+    print(f"{'strategy':<32} {'rounds/call':>12} {'M trials/s':>11} {'speedup':>8}")
+    for spec in specs:
+        strategy = load_strategy(spec)
+        base = None
+        for chunk_size in chunk_sizes:
+            # Small chunks are slow; fewer rounds still give a stable rate
+            n = min(trials, 2000 * chunk_size)
+            start = time.perf_counter()
+            evaluate(strategy, 3, n, seed=0, chunk_size=chunk_size, name=spec)
+            rate = n / (time.perf_counter() - start)
+            base = base or rate
+            print(f"{spec:<32} {chunk_size:>12} {rate / 1e6:>11.3f} {rate / base:>7.0f}x")
+
+
+def bench_engine(door_counts, trial_counts, worker_counts):
+    """trials/sec of runSimulation-style jobs for every (doors, trials, workers)."""
+    results = {}
+    print(f"{'doors':>10} {'trials':>12} {'workers':>8} {'M trials/s':>11}")
+    for doors in door_counts:
+        for trials in trial_counts:
+            for workers in worker_counts:
+                # A few shards per worker so every worker has something to do
+                shard_size = max(1 << 16, math.ceil(trials / (4 * workers)))
+                start = time.perf_counter()
+                run_sharded(doors, trials, seed=0, workers=workers, shard_size=shard_size)
+                rate = 2 * trials / (time.perf_counter() - start)
+                results[f"doors={doors} trials={trials} workers={workers}"] = {"trials_per_sec": round(rate)}
+                print(f"{doors:>10} {trials:>12} {workers:>8} {rate / 1e6:>11.2f}")
+    return results
+
+
+def _add_timer(owner, name, totals, key):
+    # Accumulate the wall time of every call to owner.name into totals[key]
+    original = getattr(owner, name, None)
+    if original is None:
+        return
+
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            totals[key] += time.perf_counter() - start
+
+    setattr(owner, name, timed)
+
+
+def profile_scene(name, quality="low_quality", cold=False):
+    """Render one scene with timers around manim's hot spots.
+
+    Meant to run in a fresh process (see bench_scenes). With `cold`, the
+    scene renders into an empty media directory so every Tex and Text
+    object is compiled from scratch.
+    """
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+    from manim import tempconfig
+    from manim.mobject.text import text_mobject
+    from manim.renderer.cairo_renderer import CairoRenderer
+    from manim.scene.scene import Scene
+    from manim.scene.scene_file_writer import SceneFileWriter
+    from manim.utils import tex_file_writing
+
+    import animations
+
+    totals = dict.fromkeys(("tex_s", "text_s", "render_s", "write_s", "play_s"), 0.0)
+    _add_timer(tex_file_writing, "compile_tex", totals, "tex_s")
+    _add_timer(tex_file_writing, "convert_to_svg", totals, "tex_s")
+    _add_timer(text_mobject.Text, "_text2svg", totals, "text_s")
+    _add_timer(CairoRenderer, "update_frame", totals, "render_s")
+    for method in ("begin_animation", "write_frame", "end_animation", "combine_to_movie"):
+        _add_timer(SceneFileWriter, method, totals, "write_s")
+    # Scene.wait() runs through play(), so this covers waits too
+    _add_timer(Scene, "play", totals, "play_s")
+
+    media_dir = tempfile.mkdtemp(prefix="bench-media-") if cold else str(ROOT / "media")
+    start = time.perf_counter()
+    with tempconfig({"quality": quality, "media_dir": media_dir, "disable_caching": True}):
+        scene = getattr(animations, name)()
+        construct_totals = {"construct": 0.0}
+        _add_timer(scene, "construct", construct_totals, "construct")
+        scene.render()
+    total = time.perf_counter() - start
+
+    # Time in construct() outside play()/wait() is scene building, Tex and Text included
+    result = {k: round(v, 4) for k, v in totals.items() if k != "play_s"}
+    result["construct_s"] = round(construct_totals["construct"] - totals["play_s"], 4)
+    result["total_s"] = round(total, 4)
+    return result
+
+
+def bench_scenes(scenes, quality, cold):
+    from render import list_scenes
+
+    scenes = scenes or list_scenes()
+    results = {}
+    header = ("construct_s", "tex_s", "text_s", "render_s", "write_s", "total_s")
+    print(f"{'scene':<26}" + "".join(f"{h:>12}" for h in header))
+    for name in scenes:
+        # A fresh process per scene so no in-memory cache carries over
+        with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+            result = pool.submit(profile_scene, name, quality, cold).result()
+        results[name] = result
+        print(f"{name:<26}" + "".join(f"{result[h]:>12.2f}" for h in header))
+    return results
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def bench_service(requests, concurrency, distinct_counts, trials, workers):
+    """Load-test a service.py subprocess, once per number of distinct requests."""
+    from service import fetch, load_test
+
+    results = {}
+    print(f"{'distinct':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'hits':>6} {'shared':>7} {'jobs':>6}")
+    for distinct in distinct_counts:
+        # A fresh server per run so each starts with an empty cache
+        port = _free_port()
+        cmd = [sys.executable, str(ROOT / "service.py"), "--port", str(port)]
+        if workers:
+            cmd += ["--workers", str(workers)]
+        server = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+        try:
+            for _ in range(100):
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            # The first request also spins up the worker pool; keep it out of the numbers
+            asyncio.run(fetch("127.0.0.1", port, "/simulate?trials=1"))
+            result = asyncio.run(load_test("127.0.0.1", port, requests, concurrency, distinct, trials=trials))
+            stats = asyncio.run(fetch("127.0.0.1", port, "/stats"))
+        finally:
+            server.terminate()
+            server.wait()
+        results[f"distinct={distinct} trials={trials} concurrency={concurrency}"] = {
+            k: result[k] for k in ("req_per_sec", "p50_ms", "p95_ms", "p99_ms")
+        }
+        print(
+            f"{distinct:>9} {result['req_per_sec']:>9.0f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+            f"{result['p99_ms']:>9.2f} {stats.get('cache_hits', 0):>6} {stats.get('coalesced', 0):>7} "
+            f"{stats.get('jobs', 0) - 1:>6}"
+        )
+    return results
+
+
+def save_results(section, results, path=RESULTS_FILE, baseline=None):
+    """Merge one section ("engine", "scenes" or "service") into the results file, and the baseline if given."""
+    for target in (path, baseline) if baseline else (path,):
+        data = load_results(target) or {}
+        data.setdefault(section, {}).update(results)
+        data["meta"] = {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        Path(target).write_text(json.dumps(data, indent=2, sort_keys=True))
+
+
+def load_results(path):
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def compare_results(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compare results to a baseline; return a list of (name, metric, old, new, change, regressed)."""
+    rows = []
+    for section in ("engine", "scenes", "service"):
+        for key, metrics in results.get(section, {}).items():
+            base = baseline.get(section, {}).get(key, {})
+            for metric, new in metrics.items():
+                old = base.get(metric)
+                if not old:
+                    continue
+                higher_is_better = metric in HIGHER_IS_BETTER
+                floor = MIN_COMPARED_MS if metric.endswith("_ms") else MIN_COMPARED_SECONDS
+                if not higher_is_better and max(old, new) < floor:
+                    continue
+                change = (new - old) / old
+                worse = -change if higher_is_better else change
+                rows.append((f"{section}/{key}", metric, old, new, change, worse > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monty Hall benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    doors = sub.add_parser("doors", help="trials/sec as the door count grows")
+    doors.add_argument("--trials", type=float, default=5e6, help="simulations per strategy")
+
+    grid = sub.add_parser("grid", help="GeneralizedMontyHall per-door vs batched door grid")
+    grid.add_argument("--doors", type=int, nargs="+", default=[100, 1_000, 10_000], help="door counts")
+    grid.add_argument("--max-per-door", type=int, default=1_000, help="skip the per-door path above this")
+
+    strategies = sub.add_parser("strategies", help="strategy plugins: per-round vs per-chunk calls")
+    strategies.add_argument("--trials", type=float, default=1e7, help="rounds per measurement (at most)")
+    strategies.add_argument("--chunk-sizes", type=int, nargs="+", default=[1, 16, 256, 4096, 1 << 16])
+    strategies.add_argument(
+        "--strategies", nargs="+", default=["always_switch", "switch_with_probability=0.5"],
+        help='"name", "name=value" or "module:function"',
+    )
+
+    engine = sub.add_parser("engine", help="engine trials/sec by doors, trials and workers")
+    engine.add_argument("--doors", type=int, nargs="+", default=[3, 100, 10_000, 1_000_000])
+    engine.add_argument("--trials", type=float, nargs="+", default=[1e6, 1e7])
+    engine.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+
+    scenes = sub.add_parser("scenes", help="per-scene construct, Tex, Text, render and write time")
+    scenes.add_argument("scenes", nargs="*", help="scenes to profile (default: all)")
+    scenes.add_argument("--quality", default="low_quality", help="manim quality")
+    scenes.add_argument("--cold", action="store_true", help="start from empty Tex/Text caches")
+
+    service = sub.add_parser("service", help="service.py throughput and latency under local load")
+    service.add_argument("--requests", type=int, default=5000, help="requests per run")
+    service.add_argument("--concurrency", type=int, default=64, help="keep-alive client connections")
+    service.add_argument("--distinct", type=int, nargs="+", default=[10, 100, 1000], help="distinct seeds per run")
+    service.add_argument("--trials", type=int, default=10**5, help="trials per request")
+    service.add_argument("--workers", type=int, default=None, help="server worker processes")
+
+    for p in (engine, scenes, service):
+        p.add_argument("--output", default=str(RESULTS_FILE), help="results JSON file")
+        p.add_argument("--save-baseline", action="store_true", help="also store as the baseline")
+        p.add_argument("--baseline", default=str(BASELINE_FILE), help="baseline JSON file")
+
+    compare = sub.add_parser("compare", help="flag regressions against a baseline")
+    compare.add_argument("results", nargs="?", default=str(RESULTS_FILE))
+    compare.add_argument("--baseline", default=str(BASELINE_FILE))
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, e.g. 0.1")
+
+    args = parser.parse_args(argv)
+    if args.bench == "doors":
+        bench_doors(int(args.trials))
+    elif args.bench == "grid":
+        bench_grid(args.doors, args.max_per_door)
+    elif args.bench == "strategies":
+        bench_strategies(int(args.trials), args.chunk_sizes, args.strategies)
+    elif args.bench == "engine":
+        results = bench_engine(args.doors, [int(t) for t in args.trials], args.workers)
+        save_results("engine", results, args.output, args.baseline if args.save_baseline else None)
+    elif args.bench == "scenes":
+        results = bench_scenes(args.scenes, args.quality, args.cold)
+        save_results("scenes", results, args.output, args.baseline if args.save_baseline else None)
+    elif args.bench == "service":
+        results = bench_service(args.requests, args.concurrency, args.distinct, args.trials, args.workers)
+        save_results("service", results, args.output, args.baseline if args.save_baseline else None)
+    elif args.bench == "compare":
+        results, baseline = load_results(args.results), load_results(args.baseline)
+        if results is None or baseline is None:
+            print("Missing results or baseline file.")
+            return 2
+        rows = compare_results(results, baseline, args.threshold)
+        for name, metric, old, new, change, regressed in rows:
+            flag = "REGRESSION" if regressed else ""
+            print(f"{name:<48} {metric:<15} {old:>14.4g} {new:>14.4g} {change:>+8.1%}  {flag}")
+        regressions = sum(r[-1] for r in rows)
+        print(f"\n{regressions} regression(s) beyond {args.threshold:.0%}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
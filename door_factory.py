@@ -0,0 +1,55 @@
+"""
+Shared door and number-label factory for the scenes in animations.py.
+
+Every scene draws the same door: a blue Rectangle with a white Circle that
+holds a number Text. Templates are built once per size/label/font and scenes
+get copies, so a label glyph is rasterized once per process, at one
+canonical font size, instead of once per door per scene.
+"""
+
+from functools import lru_cache
+
+from manim import BLACK, BLUE_C, WHITE, Circle, Rectangle, Text, VGroup
+
+# Labels are rendered at this size and scaled, so one glyph serves every font size
+GLYPH_FONT_SIZE = 48
+
+
+@lru_cache(maxsize=None)
+def _door_template(height, width, scale):
+    return Rectangle(height=height, width=width, color=WHITE, fill_color=BLUE_C, fill_opacity=1).scale(scale)
+
+
+@lru_cache(maxsize=None)
+def _glyph_template(text, font, color):
+    return Text(text, font=font, color=color, font_size=GLYPH_FONT_SIZE)
+
+
+@lru_cache(maxsize=None)
+def _label_template(text, font_size, radius, font, color):
+    circle = Circle(radius=radius, color=WHITE, fill_color=WHITE, fill_opacity=1)
+    num = make_glyph(text, font_size, font, color)
+    num.move_to(circle.get_center())
+    return VGroup(circle, num)
+
+
+def make_door(height=4, width=2, scale=1):
+    """A closed door: a copy of the cached Rectangle for this size."""
+    return _door_template(height, width, scale).copy()
+
+
+def make_glyph(text, font_size=32, font="", color=BLACK):
+    """A bare label Text, copied from the cached glyph and scaled to `font_size`."""
+    return _glyph_template(str(text), font, str(color)).copy().scale(font_size / GLYPH_FONT_SIZE)
+
+
+def make_door_label(text, font_size=32, radius=0.3, font="", color=BLACK):
+    """A number label, VGroup(circle, text), copied from the cached template."""
+    return _label_template(str(text), font_size, radius, font, str(color)).copy()
+
+
+def clear_cache():
+    """Drop all cached templates, e.g. after changing manim's config."""
+    _door_template.cache_clear()
+    _glyph_template.cache_clear()
+    _label_template.cache_clear()
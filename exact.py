@@ -0,0 +1,195 @@
+"""
+Exact Monty Hall win probabilities in rational arithmetic.
+
+Generalizes the game played by monty_hall.cpp: `doors` doors hide `cars`
+cars, the contestant picks one, the host opens `opened` of the other doors
+and a switcher moves to a random door that is still closed. A host who
+knows where the cars are always opens goats; an ignorant host opens doors at
+random, and results are conditioned on him revealing only goats.
+
+Results are memoized in exact_cache.json, so sweeps over thousands of
+parameter points are answered from disk on later runs. check_simulation()
+compares a Monte Carlo result from simulation.py with the exact values.
+
+    python exact.py 3 10 100 --opened 1
+    python exact.py 3 --cars 2 --opened 0 --ignorant
+    python exact.py 3 100 --all-but-one --check 1e6
+"""
+
+import argparse
+import atexit
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from fractions import Fraction
+from math import comb
+from pathlib import Path
+from statistics import NormalDist
+
+from locks import file_lock
+from simulation import simulate, wilson_interval
+
+CACHE_FILE = Path(__file__).resolve().parent / "exact_cache.json"
+
+
+@dataclass(frozen=True)
+class ExactResult:
+    doors: int
+    cars: int
+    opened: int
+    host_knows: bool
+    stay: Fraction
+    switch: Fraction
+    # Chance an ignorant host shows a car (always 0 when he knows)
+    car_revealed: Fraction
+
+    @property
+    def advantage(self):
+        """How many times more likely switching is to win than staying."""
+        return self.switch / self.stay
+
+
+def _check_game(doors, cars, opened):
+    if doors < 3:
+        raise ValueError("need at least 3 doors")
+    if not 1 <= cars < doors:
+        raise ValueError(f"cars must be between 1 and {doors - 1}")
+    if not 0 <= opened <= min(doors - 2, doors - cars - 1):
+        raise ValueError(f"host can open between 0 and {min(doors - 2, doors - cars - 1)} doors")
+
+
+def solve(doors=3, cars=1, opened=1, host_knows=True):
+    """Exact win probabilities of staying and switching, as Fractions."""
+    _check_game(doors, cars, opened)
+    others = doors - 1
+    closed = others - opened
+    shown_goats = stay = switch = Fraction(0)
+    for picked_car, pick in ((1, Fraction(cars, doors)), (0, Fraction(doors - cars, doors))):
+        cars_left = cars - picked_car
+        goats_left = others - cars_left
+        # Chance that every opened door is a goat
+        goats = Fraction(1) if host_knows else Fraction(comb(goats_left, opened), comb(others, opened))
+        weight = pick * goats
+        shown_goats += weight
+        stay += weight * picked_car
+        switch += weight * Fraction(cars_left, closed)
+    return ExactResult(doors, cars, opened, host_knows, stay / shown_goats, switch / shown_goats, 1 - shown_goats)
+
+
+def _key(doors, cars, opened, host_knows):
+    return f"{doors},{cars},{opened},{int(host_knows)}"
+
+
+class ExactCache:
+    """solve() memoized in memory and in a JSON file that persists between runs."""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = Path(path)
+        self.dirty = False
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        entries = {}
+        for key, values in data.items():
+            doors, cars, opened, host_knows = (int(x) for x in key.split(","))
+            stay, switch, car_revealed = (Fraction(v) for v in values)
+            entries[key] = ExactResult(doors, cars, opened, bool(host_knows), stay, switch, car_revealed)
+        return entries
+
+    def get(self, doors=3, cars=1, opened=1, host_knows=True):
+        key = _key(doors, cars, opened, host_knows)
+        result = self.entries.get(key)
+        if result is None:
+            result = self.entries[key] = solve(doors, cars, opened, host_knows)
+            self.dirty = True
+        return result
+
+    def sweep(self, points):
+        """Results for an iterable of (doors, cars, opened, host_knows) tuples."""
+        return [self.get(*point) for point in points]
+
+    def save(self):
+        """Merge this process's entries into the file.
+
+        Render workers save at exit in parallel, so the file is re-read under
+        a lock and each process writes its own temp file before the rename.
+        """
+        if not self.dirty:
+            return
+        with file_lock(self.path.with_suffix(".lock")):
+            self.entries = {**self._load(), **self.entries}
+            data = {
+                key: [str(r.stay), str(r.switch), str(r.car_revealed)] for key, r in sorted(self.entries.items())
+            }
+            # Write then rename, so an interrupted save never leaves a broken cache
+            with tempfile.NamedTemporaryFile("w", dir=self.path.parent, prefix=self.path.name, suffix=".tmp",
+                                             delete=False) as tmp:
+                tmp.write(json.dumps(data, separators=(",", ":")))
+            try:
+                os.replace(tmp.name, self.path)
+            except OSError:
+                os.unlink(tmp.name)
+                raise
+        self.dirty = False
+
+
+_cache = None
+
+
+def default_cache():
+    """The process-wide cache on CACHE_FILE, saved when the interpreter exits."""
+    global _cache
+    if _cache is None:
+        _cache = ExactCache()
+        atexit.register(_cache.save)
+    return _cache
+
+
+def probabilities(doors=3, cars=1, opened=1, host_knows=True):
+    """Memoized solve()."""
+    return default_cache().get(doors, cars, opened, host_knows)
+
+
+def check_simulation(result, confidence=0.95):
+    """Compare a SimulationResult with the exact values.
+
+    Returns (strategy, exact, estimate, low, high, agrees) per strategy, where
+    [low, high] is the Wilson interval of the estimate.
+    """
+    exact = probabilities(result.doors, 1, result.opened, True)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    rows = []
+    for name, wins, p in (("switch", result.switch_wins, exact.switch), ("stay", result.stay_wins, exact.stay)):
+        low, high = wilson_interval(wins, result.trials, z)
+        rows.append((name, p, wins / result.trials, low, high, low <= p <= high))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exact Monty Hall win probabilities")
+    parser.add_argument("doors", type=int, nargs="+", help="door counts")
+    parser.add_argument("--cars", type=int, default=1, help="number of cars")
+    parser.add_argument("--opened", type=int, default=1, help="doors the host opens")
+    parser.add_argument("--all-but-one", action="store_true", help="host opens all but one other door")
+    parser.add_argument("--ignorant", action="store_true", help="host opens doors at random")
+    parser.add_argument("--check", type=float, default=0, help="also simulate this many trials and compare")
+    args = parser.parse_args(argv)
+
+    print(f"{'doors':>8} {'opened':>7} {'P(stay)':>14} {'P(switch)':>14} {'P(car shown)':>13}")
+    for doors in args.doors:
+        opened = doors - args.cars - 1 if args.all_but_one else args.opened
+        r = probabilities(doors, args.cars, opened, not args.ignorant)
+        print(f"{doors:>8} {opened:>7} {str(r.stay):>14} {str(r.switch):>14} {float(r.car_revealed):>13.4f}")
+        if args.check and args.cars == 1 and not args.ignorant:
+            for name, p, estimate, low, high, agrees in check_simulation(simulate(doors, int(args.check), opened=opened)):
+                status = "ok" if agrees else "OUTSIDE 95% INTERVAL"
+                print(f"{'':>8} {name:<7} exact {float(p):.4f}  simulated {estimate:.4f} [{low:.4f}, {high:.4f}]  {status}")
+
+
+if __name__ == "__main__":
+    main()
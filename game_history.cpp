@@ -0,0 +1,312 @@
+/**
+ * @file game_history.cpp
+ * @brief Implements the memory-mapped, incrementally indexed game history.
+ *
+ * The index stores totals per (mode, doors, switched, day) bucket together
+ * with the number of log records it covers, so each update only reads the
+ * tail of the log that was appended since.
+ */
+
+ #include "game_history.h"
+ #include <cstdio>
+ #include <cstring>
+ #include <ctime>
+ #include <iomanip>
+ #include <iostream>
+ #include <vector>
+ 
+ #ifdef _WIN32
+ #include <windows.h>
+ #else
+ #include <fcntl.h>
+ #include <sys/mman.h>
+ #include <sys/stat.h>
+ #include <unistd.h>
+ #endif
+ 
+ using namespace std;
+ 
+ /**
+  * @struct IndexEntry
+  * @brief On-disk form of one index bucket (32 bytes, host byte order).
+  */
+ struct IndexEntry {
+     int32_t day;
+     uint32_t doors;
+     uint8_t mode;
+     uint8_t switched;
+     uint8_t reserved[6];
+     uint64_t games;
+     uint64_t wins;
+ };
+ 
+ static_assert(sizeof(IndexEntry) == 32, "IndexEntry must stay 32 bytes");
+ 
+ /**
+  * @class MappedFile
+  * @brief Read-only memory mapping of a whole file.
+  */
+ class MappedFile {
+ private:
+     const unsigned char* bytes = nullptr;
+     size_t length = 0;
+ #ifdef _WIN32
+     HANDLE file = INVALID_HANDLE_VALUE;
+     HANDLE mapping = NULL;
+ #endif
+ 
+ public:
+     explicit MappedFile(const string& path) {
+ #ifdef _WIN32
+         file = CreateFileA(path.c_str(), GENERIC_READ, FILE_SHARE_READ | FILE_SHARE_WRITE, NULL,
+                            OPEN_EXISTING, FILE_ATTRIBUTE_NORMAL, NULL);
+         if (file == INVALID_HANDLE_VALUE) return;
+         LARGE_INTEGER size;
+         if (!GetFileSizeEx(file, &size) || size.QuadPart == 0) return;
+         mapping = CreateFileMappingA(file, NULL, PAGE_READONLY, 0, 0, NULL);
+         if (!mapping) return;
+         bytes = static_cast<const unsigned char*>(MapViewOfFile(mapping, FILE_MAP_READ, 0, 0, 0));
+         if (bytes) length = static_cast<size_t>(size.QuadPart);
+ #else
+         int fd = open(path.c_str(), O_RDONLY);
+         if (fd < 0) return;
+         struct stat st;
+         if (fstat(fd, &st) == 0 && st.st_size > 0) {
+             void* p = mmap(NULL, static_cast<size_t>(st.st_size), PROT_READ, MAP_PRIVATE, fd, 0);
+             if (p != MAP_FAILED) {
+                 bytes = static_cast<const unsigned char*>(p);
+                 length = static_cast<size_t>(st.st_size);
+             }
+         }
+         close(fd);
+ #endif
+     }
+ 
+     ~MappedFile() {
+ #ifdef _WIN32
+         if (bytes) UnmapViewOfFile(bytes);
+         if (mapping) CloseHandle(mapping);
+         if (file != INVALID_HANDLE_VALUE) CloseHandle(file);
+ #else
+         if (bytes) munmap(const_cast<unsigned char*>(bytes), length);
+ #endif
+     }
+ 
+     MappedFile(const MappedFile&) = delete;
+     MappedFile& operator=(const MappedFile&) = delete;
+ 
+     const unsigned char* data() const { return bytes; }
+     size_t size() const { return length; }
+ };
+ 
+ /**
+  * @brief Opens the index for a log without reading either file yet.
+  */
+ GameHistory::GameHistory(const string& log, const string& index)
+     : logPath(log), indexPath(index), indexedRecords(0), firstTimestamp(0) {}
+ 
+ /**
+  * @brief Forgets all indexed records.
+  */
+ void GameHistory::clear() {
+     indexedRecords = 0;
+     firstTimestamp = 0;
+     buckets.clear();
+ }
+ 
+ /**
+  * @brief Reads the saved index; returns false if it is missing or invalid.
+  */
+ bool GameHistory::loadIndex() {
+     clear();
+     FILE* file = fopen(indexPath.c_str(), "rb");
+     if (!file) return false;
+ 
+     char magic[GAME_LOG_HEADER_SIZE];
+     uint64_t records = 0, count = 0;
+     int64_t first = 0;
+     bool ok = fread(magic, 1, sizeof(magic), file) == sizeof(magic) &&
+               memcmp(magic, GAME_INDEX_MAGIC, sizeof(magic)) == 0 &&
+               fread(&records, sizeof(records), 1, file) == 1 &&
+               fread(&first, sizeof(first), 1, file) == 1 &&
+               fread(&count, sizeof(count), 1, file) == 1;
+ 
+     vector<IndexEntry> entries(ok ? count : 0);
+     ok = ok && fread(entries.data(), sizeof(IndexEntry), entries.size(), file) == entries.size();
+     fclose(file);
+     if (!ok) return false;
+ 
+     for (const IndexEntry& e : entries) {
+         HistoryTotals& totals = buckets[HistoryKey(e.mode, e.doors, e.switched, e.day)];
+         totals.games = e.games;
+         totals.wins = e.wins;
+     }
+     indexedRecords = records;
+     firstTimestamp = first;
+     return true;
+ }
+ 
+ /**
+  * @brief Writes the index to a temporary file and renames it into place.
+  */
+ bool GameHistory::saveIndex() const {
+     vector<IndexEntry> entries;
+     entries.reserve(buckets.size());
+     for (const auto& bucket : buckets) {
+         IndexEntry e = {};
+         e.mode = get<0>(bucket.first);
+         e.doors = get<1>(bucket.first);
+         e.switched = get<2>(bucket.first);
+         e.day = get<3>(bucket.first);
+         e.games = bucket.second.games;
+         e.wins = bucket.second.wins;
+         entries.push_back(e);
+     }
+ 
+     string tmpPath = indexPath + ".tmp";
+     FILE* file = fopen(tmpPath.c_str(), "wb");
+     if (!file) return false;
+ 
+     uint64_t count = entries.size();
+     bool ok = fwrite(GAME_INDEX_MAGIC, 1, GAME_LOG_HEADER_SIZE, file) == GAME_LOG_HEADER_SIZE &&
+               fwrite(&indexedRecords, sizeof(indexedRecords), 1, file) == 1 &&
+               fwrite(&firstTimestamp, sizeof(firstTimestamp), 1, file) == 1 &&
+               fwrite(&count, sizeof(count), 1, file) == 1 &&
+               fwrite(entries.data(), sizeof(IndexEntry), entries.size(), file) == entries.size();
+     ok = (fclose(file) == 0) && ok;
+ 
+     if (ok) {
+         remove(indexPath.c_str());
+         ok = rename(tmpPath.c_str(), indexPath.c_str()) == 0;
+     }
+     return ok;
+ }
+ 
+ /**
+  * @brief Indexes the records appended to the log since the last update.
+  */
+ long long GameHistory::update() {
+     GameLog::instance().flush();
+ 
+     MappedFile log(logPath);
+     if (!log.data() || log.size() < GAME_LOG_HEADER_SIZE ||
+         memcmp(log.data(), GAME_LOG_MAGIC, GAME_LOG_HEADER_SIZE) != 0) {
+         clear();
+         return -1;
+     }
+ 
+     // The header keeps records 8-byte aligned within the page-aligned mapping
+     uint64_t total = (log.size() - GAME_LOG_HEADER_SIZE) / sizeof(GameRecord);
+     const GameRecord* records = reinterpret_cast<const GameRecord*>(log.data() + GAME_LOG_HEADER_SIZE);
+ 
+     bool valid = loadIndex() && indexedRecords <= total &&
+                  (indexedRecords == 0 || records[0].timestamp == firstTimestamp);
+     if (!valid) clear();
+     if (total > 0 && indexedRecords == 0) firstTimestamp = records[0].timestamp;
+ 
+     for (uint64_t i = indexedRecords; i < total; ++i) {
+         const GameRecord& r = records[i];
+         int32_t day = static_cast<int32_t>(r.timestamp / HISTORY_BUCKET_SECONDS);
+         HistoryTotals& totals = buckets[HistoryKey(r.mode, r.doors, r.switched, day)];
+         totals.games++;
+         totals.wins += r.won;
+     }
+ 
+     long long added = static_cast<long long>(total - indexedRecords);
+     indexedRecords = total;
+     if (added > 0 || !valid) saveIndex();
+     return added;
+ }
+ 
+ /**
+  * @brief Sums the buckets matching a filter.
+  */
+ HistoryTotals GameHistory::query(const HistoryQuery& q) const {
+     int32_t sinceDay = static_cast<int32_t>(q.since / HISTORY_BUCKET_SECONDS);
+     HistoryTotals result;
+     for (const auto& bucket : buckets) {
+         const HistoryKey& key = bucket.first;
+         if (q.mode >= 0 && get<0>(key) != q.mode) continue;
+         if (q.doors != 0 && get<1>(key) != q.doors) continue;
+         if (q.switched >= 0 && get<2>(key) != q.switched) continue;
+         if (get<3>(key) < sinceDay) continue;
+         result.games += bucket.second.games;
+         result.wins += bucket.second.wins;
+     }
+     return result;
+ }
+ 
+ /**
+  * @brief Prints one row of the statistics table.
+  */
+ static void printTotalsRow(const char* mode, uint32_t doors, bool switched, const HistoryTotals& t) {
+     cout << left << setw(13) << mode << right << setw(6) << doors << "  "
+          << left << setw(9) << (switched ? "Yes" : "No") << right
+          << setw(12) << t.games << setw(12) << t.wins
+          << setw(9) << fixed << setprecision(2) << 100.0 * t.winRate() << "%\n";
+ }
+ 
+ /**
+  * @brief Prints totals per mode, door count and switch decision, plus the last week.
+  */
+ void printHistorySummary(const GameHistory& history) {
+     // Collapse the day dimension; buckets are already ordered by mode, doors, switched
+     map<tuple<uint8_t, uint32_t, uint8_t>, HistoryTotals> groups;
+     for (const auto& bucket : history.allBuckets()) {
+         const HistoryKey& key = bucket.first;
+         HistoryTotals& t = groups[make_tuple(get<0>(key), get<1>(key), get<2>(key))];
+         t.games += bucket.second.games;
+         t.wins += bucket.second.wins;
+     }
+ 
+     cout << "\n=== Game Statistics (" << history.recordCount() << " games) ===\n";
+     cout << left << setw(13) << "Mode" << right << setw(6) << "Doors" << "  "
+          << left << setw(9) << "Switched" << right
+          << setw(12) << "Games" << setw(12) << "Wins" << setw(10) << "Win rate" << "\n";
+     for (const auto& group : groups)
+         printTotalsRow(gameModeName(get<0>(group.first)), get<1>(group.first), get<2>(group.first) != 0, group.second);
+ 
+     HistoryQuery lastWeek;
+     lastWeek.since = static_cast<int64_t>(time(0)) - 6 * HISTORY_BUCKET_SECONDS;
+     HistoryTotals week = history.query(lastWeek);
+     cout << "\nLast 7 days: " << week.games << " games, "
+          << fixed << setprecision(2) << 100.0 * week.winRate() << "% won\n";
+     cout.unsetf(ios::fixed);
+     cout << setprecision(6);
+ }
+ 
+ /**
+  * @brief Asks for a filter, updates the index and prints the matching totals.
+  */
+ void queryGameStats() {
+     HistoryQuery q;
+     char mode, switched;
+     int days;
+ 
+     cout << "Mode (i = interactive, s = simulation, a = any): ";
+     cin >> mode;
+     cout << "Number of doors (0 = any): ";
+     cin >> q.doors;
+     cout << "Switched? (y = yes, n = no, a = any): ";
+     cin >> switched;
+     cout << "Only the last N days (0 = all time): ";
+     cin >> days;
+ 
+     if (mode == 'i' || mode == 'I') q.mode = MODE_INTERACTIVE;
+     else if (mode == 's' || mode == 'S') q.mode = MODE_SIMULATION;
+     if (switched == 'y' || switched == 'Y') q.switched = 1;
+     else if (switched == 'n' || switched == 'N') q.switched = 0;
+     if (days > 0) q.since = static_cast<int64_t>(time(0)) - (days - 1) * HISTORY_BUCKET_SECONDS;
+ 
+     GameHistory history;
+     if (history.update() < 0) {
+         cout << "\nNo statistics recorded yet.\n";
+         return;
+     }
+ 
+     HistoryTotals t = history.query(q);
+     cout << "\nMatching games: " << t.games << ", Wins: " << t.wins
+          << ", Win rate: " << fixed << setprecision(2) << 100.0 * t.winRate() << "%\n";
+     cout.unsetf(ios::fixed);
+     cout << setprecision(6);
+ }
@@ -0,0 +1,121 @@
+/**
+ * @file game_history.h
+ * @brief Indexed queries over the binary game log.
+ *
+ * Keeps a small on-disk summary of game_stats.bin, bucketed by day, mode,
+ * door count and switch decision. The log is memory-mapped and only records
+ * appended since the last update are scanned, so summaries and filtered
+ * queries never need a full pass over a large history.
+ */
+
+ #ifndef GAME_HISTORY_H
+ #define GAME_HISTORY_H
+ 
+ #include "monty_hall.h"
+ #include <cstdint>
+ #include <map>
+ #include <string>
+ #include <tuple>
+ 
+ /// Index file kept next to the binary game log
+ #define GAME_INDEX_FILE "game_stats.idx"
+ 
+ /// Magic bytes at the start of the index file (format version 1)
+ #define GAME_INDEX_MAGIC "MHIDX\x01\0"
+ 
+ /// Seconds per index time bucket (one day, UTC)
+ const std::int64_t HISTORY_BUCKET_SECONDS = 86400;
+ 
+ /**
+  * @struct HistoryTotals
+  * @brief Game and win counts for a set of records.
+  */
+ struct HistoryTotals {
+     std::uint64_t games = 0; ///< Games played
+     std::uint64_t wins = 0;  ///< Games won
+ 
+     /**
+      * @brief Win rate, or 0 when no games match.
+      */
+     double winRate() const { return games ? static_cast<double>(wins) / games : 0.0; }
+ };
+ 
+ /**
+  * @struct HistoryQuery
+  * @brief Filter for queryHistory; fields left at their defaults match everything.
+  */
+ struct HistoryQuery {
+     int mode = -1;             ///< GameMode value, or -1 for any
+     std::uint32_t doors = 0;   ///< Number of doors, or 0 for any
+     int switched = -1;         ///< 1 switched, 0 stayed, -1 for any
+     std::int64_t since = 0;    ///< Only games on or after this day (epoch seconds), 0 for all
+ };
+ 
+ /// Index bucket key: (mode, doors, switched, day)
+ typedef std::tuple<std::uint8_t, std::uint32_t, std::uint8_t, std::int32_t> HistoryKey;
+ 
+ /**
+  * @class GameHistory
+  * @brief Incrementally updated summary index over the binary game log.
+  */
+ class GameHistory {
+ private:
+     std::string logPath;                        ///< Binary game log
+     std::string indexPath;                      ///< Summary index file
+     std::uint64_t indexedRecords;               ///< Log records already in the index
+     std::int64_t firstTimestamp;                ///< First record's timestamp, to detect a replaced log
+     std::map<HistoryKey, HistoryTotals> buckets; ///< Totals per bucket
+ 
+     bool loadIndex();
+     bool saveIndex() const;
+     void clear();
+ 
+ public:
+     /**
+      * @brief Opens the index for a log; call update() before querying.
+      * @param log Binary game log
+      * @param index Summary index file
+      */
+     explicit GameHistory(const std::string& log = GAME_LOG_FILE, const std::string& index = GAME_INDEX_FILE);
+ 
+     /**
+      * @brief Brings the index up to date with the log.
+      *
+      * Flushes pending log records, memory-maps the log, scans only the records
+      * appended since the last update and saves the index. A log that shrank or
+      * was replaced is re-indexed from the start.
+      * @return Number of newly indexed records, or -1 if there is no valid log
+      */
+     long long update();
+ 
+     /**
+      * @brief Totals for all indexed games matching a filter.
+      *
+      * Time filtering has day granularity: @p query.since is rounded down to
+      * the start of its (UTC) day.
+      */
+     HistoryTotals query(const HistoryQuery& query) const;
+ 
+     /**
+      * @brief All index buckets, ordered by mode, doors, switched and day.
+      */
+     const std::map<HistoryKey, HistoryTotals>& allBuckets() const { return buckets; }
+ 
+     /**
+      * @brief Number of log records covered by the index.
+      */
+     std::uint64_t recordCount() const { return indexedRecords; }
+ };
+ 
+ /**
+  * @brief Prints win/loss totals per mode, door count and switch decision.
+  * @param history An up-to-date history index
+  */
+ void printHistorySummary(const GameHistory& history);
+ 
+ /**
+  * @brief Prompts for a filter and prints the matching totals.
+  */
+ void queryGameStats();
+ 
+ #endif // GAME_HISTORY_H
@@ -5,11 +5,15 @@
  * Provides a text-based menu that allows users to:
  * - Play interactive Monty Hall games (3 or custom n doors)
  * - Run simulations to analyze winning strategies
- * - View a log of past results stored in a text file
+ * - Run adaptive simulations that stop once the win rates are precise enough
+ * - View and query statistics of past results stored in a binary log file
+ * - Export that log as text
  */
 
  #include "monty_hall.h"
+ #include "game_history.h"
  #include <iostream>
+ #include <limits>
  
  using namespace std;
  
@@ -23,9 +27,12 @@
      cout << "3. Run simulation (3 doors)\n";
      cout << "4. Run simulation (n doors)\n";
      cout << "5. View past statistics\n";
-     cout << "6. Exit\n";
+     cout << "6. Run adaptive simulation (n doors)\n";
+     cout << "7. Export history to text file\n";
+     cout << "8. Query past statistics\n";
+     cout << "9. Exit\n";
      cout << "====================================\n";
-     cout << "Choose an option (1-6): ";
+     cout << "Choose an option (1-9): ";
  }
  
  /**
@@ -38,7 +45,14 @@
      int choice;
      do {
          showMenu();
-         cin >> choice;
+         if (!(cin >> choice)) {
+             // End of input: leave rather than replay the last option forever
+             if (cin.eof())
+                 break;
+             choice = 0;
+             cin.clear();
+             cin.ignore(numeric_limits<streamsize>::max(), '\n');
+         }
  
          if (choice == 1) {
              MontyHall game(3);
@@ -66,12 +80,34 @@
          } else if (choice == 5) {
              viewGameStats();
          } else if (choice == 6) {
+             int doors;
+             double precision;
+             cout << "Enter number of doors (minimum 3): ";
+             cin >> doors;
+             cout << "Enter target precision (e.g. 0.001): ";
+             if (!(cin >> precision) || precision <= 0) {
+                 cout << "Precision must be a positive number.\n";
+                 cin.clear();
+                 cin.ignore(numeric_limits<streamsize>::max(), '\n');
+                 continue;
+             }
+             MontyHall game(doors);
+             game.runAdaptiveSimulation(precision);
+         } else if (choice == 7) {
+             long long exported = exportGameLogText();
+             if (exported < 0)
+                 cout << "Could not write game_stats_export.txt\n";
+             else
+                 cout << "Exported " << exported << " games to game_stats_export.txt\n";
+         } else if (choice == 8) {
+             queryGameStats();
+         } else if (choice == 9) {
              cout << "Goodbye!\n";
          } else {
              cout << "Invalid choice. Try again.\n";
          }
  
-     } while (choice != 6);
+     } while (choice != 9);
  
      return 0;
  }
\ No newline at end of file
@@ -7,6 +7,7 @@
  */
 
  #include "monty_hall.h"
+ #include "game_history.h"
  #include <iostream>
  #include <vector>
  #include <algorithm>
@@ -15,9 +16,24 @@
  #include <fstream>
  #include <iomanip>
  #include <cstring>
+ #include <cmath>
+ #include <cstdio>
+ #include <string>
+ #include <limits>
+ 
+ #ifdef _WIN32
+ #define NOMINMAX
+ #include <windows.h>
+ #else
+ #include <sys/ioctl.h>
+ #include <unistd.h>
+ #endif
  
  using namespace std;
  
+ /// Runs of at least this many identical doors are drawn as one summary line
+ static const int DOOR_RUN_COLLAPSE = 24;
+ 
  /**
   * @brief Constructor that sets number of doors and seeds random generator.
   */
@@ -26,25 +42,34 @@
      srand(static_cast<unsigned int>(time(0))); // seed only once
  }
  
+ /**
+  * @brief Picks a random door other than doors a and b in constant time.
+  *
+  * Draws the rank of the door among the allowed ones and skips over the
+  * excluded doors, instead of building and shuffling a candidate list.
+  * a and b may be the same door.
+  */
+ static int randomDoorExcluding(int numDoors, int a, int b) {
+     int lo = min(a, b), hi = max(a, b);
+     int door = rand() % (numDoors - (lo == hi ? 1 : 2));
+     if (door >= lo) door++;
+     if (lo != hi && door >= hi) door++;
+     return door;
+ }
+ 
  /**
   * @brief Runs a single simulation of the Monty Hall game internally.
   *
   * Randomly selects the prize and player’s initial choice.
   * Simulates Monty revealing one goat door, and the player switching if enabled.
+  * Runs in constant time regardless of the number of doors.
   * @return True if the player ends up choosing the prize door.
   */
  bool MontyHall::playSingleSimulation() {
      prizeDoor = rand() % doors;
      userChoice = rand() % doors;
  
-     vector<int> revealCandidates;
-     for (int i = 0; i < doors; ++i) {
-         if (i != prizeDoor && i != userChoice)
-             revealCandidates.push_back(i);
-     }
- 
-     random_shuffle(revealCandidates.begin(), revealCandidates.end());
-     hostOpens = revealCandidates[0];
+     hostOpens = randomDoorExcluding(doors, prizeDoor, userChoice);
  
      if (switchChoice) {
          for (int i = 0; i < doors; ++i) {
@@ -84,6 +109,84 @@
      cout << "Stayed    -> Wins: " << stayWins << ", Losses: " << (simulations - stayWins) << "\n";
  }
  
+ /**
+  * @brief Computes the 95% Wilson score interval for a running win count.
+  */
+ static void wilsonInterval(long long wins, long long trials, double& low, double& high) {
+     const double z = 1.96;
+     if (trials == 0) {
+         low = 0.0;
+         high = 1.0;
+         return;
+     }
+     double n = static_cast<double>(trials);
+     double w = static_cast<double>(wins);
+     double denom = n + z * z;
+     double center = (w + z * z / 2) / denom;
+     double half = z / denom * sqrt(w * (n - w) / n + z * z / 4);
+     low = max(center - half, 0.0);
+     high = min(center + half, 1.0);
+ }
+ 
+ /**
+  * @brief Runs one strategy in batches until the interval is narrow enough.
+  *
+  * Checks the interval after every batch and stops at the first one that
+  * reaches the target precision, so converged points are not over-simulated.
+  */
+ static void playUntilPrecise(MontyHall& game, long long& wins, long long& trials,
+                              double precision, long long maxTrials) {
+     const long long batch = 1000;
+     wins = trials = 0;
+     double low, high;
+     while (trials < maxTrials) {
+         if (trials > 0) {
+             wilsonInterval(wins, trials, low, high);
+             if ((high - low) / 2 <= precision) break;
+         }
+         long long size = min(batch, maxTrials - trials);
+         for (long long i = 0; i < size; ++i)
+             if (game.playSingleSimulation()) wins++;
+         trials += size;
+     }
+ }
+ 
+ /**
+  * @brief Runs each strategy until its win rate reaches the requested precision.
+  *
+  * Prints the trials used and the final 95% interval for both strategies.
+  * @param precision Target half-width of the confidence interval.
+  * @param maxTrials Maximum rounds per strategy.
+  */
+ void MontyHall::runAdaptiveSimulation(double precision, long long maxTrials) {
+     if (!(precision > 0)) {
+         cout << "Precision must be a positive number.\n";
+         return;
+     }
+     long long switchWins, switchTrials, stayWins, stayTrials;
+ 
+     switchChoice = true;
+     playUntilPrecise(*this, switchWins, switchTrials, precision, maxTrials);
+ 
+     switchChoice = false;
+     playUntilPrecise(*this, stayWins, stayTrials, precision, maxTrials);
+ 
+     double low, high;
+     cout << "\n=== Adaptive Simulation Results ===\n";
+     cout << "Number of Doors: " << doors << "\n";
+     cout << "Target Precision: +/- " << fixed << setprecision(4) << precision << " (95% confidence)\n\n";
+ 
+     wilsonInterval(switchWins, switchTrials, low, high);
+     cout << "Switched  -> Win rate: " << (switchTrials ? double(switchWins) / switchTrials : 0.0)
+          << " [" << low << ", " << high << "] after " << switchTrials << " trials\n";
+ 
+     wilsonInterval(stayWins, stayTrials, low, high);
+     cout << "Stayed    -> Win rate: " << (stayTrials ? double(stayWins) / stayTrials : 0.0)
+          << " [" << low << ", " << high << "] after " << stayTrials << " trials\n";
+     cout.unsetf(ios::fixed);
+     cout << setprecision(6);
+ }
+ 
  /**
   * @brief Runs the interactive version of the game.
   *
@@ -94,34 +197,37 @@
      prizeDoor = rand() % doors;
  
      printIntroDiagram(doors);
-     cout << "Pick a door (1 to " << doors << "): ";
-     cin >> userChoice;
+     // Re-prompt until the pick is a door number; give up if input ends
+     while (true) {
+         cout << "Pick a door (1 to " << doors << "): ";
+         if (cin >> userChoice && userChoice >= 1 && userChoice <= doors)
+             break;
+         if (cin.eof())
+             return;
+         cout << "Please enter a number from 1 to " << doors << ".\n";
+         cin.clear();
+         cin.ignore(numeric_limits<streamsize>::max(), '\n');
+     }
      userChoice--;
  
-     vector<int> revealCandidates;
-     for (int i = 0; i < doors; ++i)
-         if (i != prizeDoor && i != userChoice)
-             revealCandidates.push_back(i);
-     random_shuffle(revealCandidates.begin(), revealCandidates.end());
+     // Only one other door stays closed: the prize, or a random goat if the
+     // player already picked the prize. Every remaining door is revealed.
+     int keptDoor = (userChoice != prizeDoor) ? prizeDoor : randomDoorExcluding(doors, userChoice, userChoice);
  
-     vector<int> revealedGoats(revealCandidates.begin(), revealCandidates.begin() + doors - 2);
+     vector<bool> revealedGoats(doors, true);
+     revealedGoats[userChoice] = false;
+     revealedGoats[keptDoor] = false;
  
-     cout << "\nMonty opens " << revealedGoats.size() << " goat doors:\n";
+     cout << "\nMonty opens " << (doors - 2) << " goat doors:\n";
      displayDoors(doors, revealedGoats, userChoice);
  
      cout << "Do you want to switch your choice? (y/n): ";
-     char response;
+     char response = 'n';
      cin >> response;
      switchChoice = (response == 'y' || response == 'Y');
  
-     if (switchChoice) {
-         for (int i = 0; i < doors; ++i) {
-             if (find(revealedGoats.begin(), revealedGoats.end(), i) == revealedGoats.end() && i != userChoice) {
-                 userChoice = i;
-                 break;
-             }
-         }
-     }
+     if (switchChoice)
+         userChoice = keptDoor;
  
      cout << "\nFinal Reveal:\n";
      displayDoors(doors, {}, userChoice, prizeDoor, true);
@@ -133,96 +239,319 @@
          cout << ":( You got a goat. The car was behind door " << (prizeDoor + 1) << ".\n";
  
      logGameResult("Interactive", doors, switchChoice, won);
+     // Written now rather than at exit, so Ctrl+C at the menu cannot lose it
+     GameLog::instance().flush();
+ }
+ 
+ /**
+  * @brief What a door shows in the terminal.
+  */
+ enum class DoorFace { Closed, Goat, Car };
+ 
+ static const char* faceBox(DoorFace face) {
+     return face == DoorFace::Car ? "| CAR |" : face == DoorFace::Goat ? "|GOAT |" : "| ??? |";
+ }
+ 
+ static const char* faceName(DoorFace face) {
+     return face == DoorFace::Car ? "CAR" : face == DoorFace::Goat ? "GOAT" : "???";
+ }
+ 
+ /**
+  * @brief Width of the terminal in columns: $COLUMNS, then the console itself, then 80.
+  */
+ static int terminalWidth() {
+     if (const char* columns = getenv("COLUMNS")) {
+         int width = atoi(columns);
+         if (width > 0) return width;
+     }
+ #ifdef _WIN32
+     CONSOLE_SCREEN_BUFFER_INFO info;
+     if (GetConsoleScreenBufferInfo(GetStdHandle(STD_OUTPUT_HANDLE), &info))
+         return info.srWindow.Right - info.srWindow.Left + 1;
+ #else
+     struct winsize size;
+     if (ioctl(STDOUT_FILENO, TIOCGWINSZ, &size) == 0 && size.ws_col > 0)
+         return size.ws_col;
+ #endif
+     return 80;
+ }
+ 
+ /**
+  * @brief Appends `text` padded with spaces to `width` characters.
+  */
+ static void appendPadded(string& out, const string& text, size_t width) {
+     out += text;
+     if (text.size() < width) out.append(width - text.size(), ' ');
+ }
+ 
+ /**
+  * @brief Draws doors into `out` as a grid that fits the terminal width.
+  *
+  * face(i) gives the face of door i. Runs of DOOR_RUN_COLLAPSE or more
+  * identical doors become one summary line such as "[3..998] GOAT", so the
+  * output stays a few lines long however many doors there are. The user's
+  * pick is never folded into a run and its label is marked with '*'.
+  */
+ template <typename FaceOf>
+ static void renderDoors(string& out, int numDoors, int userPick, FaceOf face) {
+     size_t cellWidth = max<size_t>(8, to_string(numDoors).size() + 4);
+     int columns = max(1, static_cast<int>((terminalWidth() - 3) / cellWidth));
+ 
+     vector<int> row;
+     row.reserve(columns);
+     auto flushRow = [&]() {
+         if (row.empty()) return;
+         out += "   ";
+         for (int door : row)
+             appendPadded(out, " [" + to_string(door + 1) + "]" + (door == userPick ? "*" : ""), cellWidth);
+         out += "\n   ";
+         for (size_t i = 0; i < row.size(); ++i) appendPadded(out, "+-----+", cellWidth);
+         out += "\n   ";
+         for (int door : row) appendPadded(out, faceBox(face(door)), cellWidth);
+         out += "\n   ";
+         for (size_t i = 0; i < row.size(); ++i) appendPadded(out, "+-----+", cellWidth);
+         out += "\n";
+         row.clear();
+     };
+ 
+     for (int start = 0; start < numDoors;) {
+         DoorFace runFace = face(start);
+         int end = start + 1;
+         if (start != userPick)
+             while (end < numDoors && end != userPick && face(end) == runFace) ++end;
+ 
+         if (end - start >= DOOR_RUN_COLLAPSE) {
+             flushRow();
+             out += "   [" + to_string(start + 1) + ".." + to_string(end) + "] " + faceName(runFace)
+                  + "  (" + to_string(end - start) + " doors)\n";
+         } else {
+             for (int door = start; door < end; ++door) {
+                 row.push_back(door);
+                 if (static_cast<int>(row.size()) == columns) flushRow();
+             }
+         }
+         start = end;
+     }
+     flushRow();
+ }
+ 
+ /**
+  * @brief Writes a finished frame to stdout in one call.
+  */
+ static void writeFrame(const string& frame) {
+     cout.write(frame.data(), static_cast<streamsize>(frame.size()));
+     cout.flush();
  }
  
  /**
   * @brief Prints an intro diagram and game description.
   */
  void printIntroDiagram(int numDoors) {
-     cout << "\n   ============================\n";
-     cout << "       MONTY HALL - " << numDoors << " DOORS\n";
-     cout << "   ============================\n\n";
- 
-     cout << "    ";
-     for (int i = 0; i < numDoors; ++i)
-         cout << "[" << (i + 1) << "]     ";
-     cout << "\n   ";
-     for (int i = 0; i < numDoors; ++i)
-         cout << "+-----+ ";
-     cout << "\n   ";
-     for (int i = 0; i < numDoors; ++i)
-         cout << "| ??? | ";
-     cout << "\n   ";
-     for (int i = 0; i < numDoors; ++i)
-         cout << "+-----+ ";
-     cout << "\n";
- 
-     cout << "\n   - One door hides a CAR\n";
-     cout << "   - The others hide GOATS\n";
-     cout << "   - Monty will reveal all goat doors except one\n";
+     string frame;
+     frame += "\n   ============================\n";
+     frame += "       MONTY HALL - " + to_string(numDoors) + " DOORS\n";
+     frame += "   ============================\n\n";
+ 
+     renderDoors(frame, numDoors, -1, [](int) { return DoorFace::Closed; });
+ 
+     frame += "\n   - One door hides a CAR\n";
+     frame += "   - The others hide GOATS\n";
+     frame += "   - Monty will reveal all goat doors except one\n";
+     writeFrame(frame);
  }
  
  /**
   * @brief Shows visual state of all doors with optional prize/goat reveal.
   */
- void displayDoors(int numDoors, vector<int> revealedGoats, int userPick, int prize, bool final) {
-     cout << "\n   Doors:\n   ";
-     for (int i = 0; i < numDoors; ++i)
-         cout << "[" << (i + 1) << "]     ";
-     cout << "\n   ";
-     for (int i = 0; i < numDoors; ++i)
-         cout << "+-----+ ";
-     cout << "\n   ";
-     for (int i = 0; i < numDoors; ++i) {
-         if (final) {
-             if (i == prize) cout << "| CAR | ";
-             else cout << "|GOAT | ";
-         } else if (find(revealedGoats.begin(), revealedGoats.end(), i) != revealedGoats.end()) {
-             cout << "|GOAT | ";
-         } else {
-             cout << "| ??? | ";
-         }
+ void displayDoors(int numDoors, const vector<bool>& revealedGoats, int userPick, int prize, bool final) {
+     string frame = "\n   Doors:\n";
+     renderDoors(frame, numDoors, userPick, [&](int door) {
+         if (final) return door == prize ? DoorFace::Car : DoorFace::Goat;
+         bool revealed = door < static_cast<int>(revealedGoats.size()) && revealedGoats[door];
+         return revealed ? DoorFace::Goat : DoorFace::Closed;
+     });
+     writeFrame(frame);
+ }
+ 
+ /**
+  * @brief Creates a buffered log for the given file.
+  */
+ GameLog::GameLog(const string& logPath, size_t bufferedRecords)
+     : path(logPath), capacity(bufferedRecords ? bufferedRecords : 1) {
+     buffer.reserve(capacity);
+ }
+ 
+ /**
+  * @brief Flushes remaining records when the log goes away.
+  */
+ GameLog::~GameLog() {
+     flush();
+ }
+ 
+ /**
+  * @brief Buffers one record and writes the batch once the buffer is full.
+  */
+ void GameLog::append(const GameRecord& record) {
+     buffer.push_back(record);
+     if (buffer.size() >= capacity)
+         flush();
+ }
+ 
+ /**
+  * @brief Cuts the file at @p path back to @p size bytes.
+  */
+ static bool truncateFile(const string& path, long size) {
+ #ifdef _WIN32
+     HANDLE file = CreateFileA(path.c_str(), GENERIC_WRITE, 0, NULL, OPEN_EXISTING, FILE_ATTRIBUTE_NORMAL, NULL);
+     if (file == INVALID_HANDLE_VALUE) return false;
+     LARGE_INTEGER offset;
+     offset.QuadPart = size;
+     bool ok = SetFilePointerEx(file, offset, NULL, FILE_BEGIN) && SetEndOfFile(file);
+     CloseHandle(file);
+     return ok;
+ #else
+     return truncate(path.c_str(), size) == 0;
+ #endif
+ }
+ 
+ /**
+  * @brief Appends all buffered records to the file in one write.
+  *
+  * Writes the file header first if the file is new or empty. If the write
+  * fails, the file is cut back to its previous length, so a torn tail never
+  * misaligns later records, and the records stay buffered for the next flush.
+  */
+ bool GameLog::flush() {
+     if (buffer.empty()) return true;
+ 
+     FILE* file = fopen(path.c_str(), "ab");
+     if (!file) return false;
+ 
+     fseek(file, 0, SEEK_END);
+     long start = ftell(file);
+     bool ok = start >= 0;
+     if (ok && start == 0)
+         ok = fwrite(GAME_LOG_MAGIC, 1, GAME_LOG_HEADER_SIZE, file) == GAME_LOG_HEADER_SIZE;
+     ok = ok && fwrite(buffer.data(), sizeof(GameRecord), buffer.size(), file) == buffer.size();
+     ok = (fclose(file) == 0) && ok;
+ 
+     if (!ok) {
+         if (start >= 0) truncateFile(path, start);
+         return false;
+     }
+     buffer.clear();
+     return true;
+ }
+ 
+ /**
+  * @brief Shared log instance, flushed by its destructor at normal process exit.
+  */
+ GameLog& GameLog::instance() {
+     static GameLog log;
+     return log;
+ }
+ 
+ /**
+  * @brief Maps a stored GameMode to its display name.
+  */
+ const char* gameModeName(uint8_t mode) {
+     switch (mode) {
+         case MODE_INTERACTIVE: return "Interactive";
+         case MODE_SIMULATION: return "Simulation";
+         default: return "Unknown";
      }
-     cout << "\n   ";
-     for (int i = 0; i < numDoors; ++i)
-         cout << "+-----+ ";
-     cout << "\n";
  }
  
  /**
-  * @brief Logs the result of a game or simulation to a local file.
+  * @brief Logs the result of a game or simulation to the buffered binary log.
   */
  void logGameResult(const string& mode, int doors, bool switched, bool won) {
-     ofstream file("game_stats.txt", ios::app);
-     if (!file) return;
+     GameRecord record = {};
+     record.timestamp = static_cast<int64_t>(time(0));
+     record.doors = static_cast<uint32_t>(doors);
+     record.mode = (mode == "Simulation") ? MODE_SIMULATION : MODE_INTERACTIVE;
+     record.switched = switched ? 1 : 0;
+     record.won = won ? 1 : 0;
+     GameLog::instance().append(record);
+ }
  
-     time_t now = time(0);
-     char* dt = ctime(&now);
-     dt[strcspn(dt, "\n")] = 0;
+ /**
+  * @brief Writes one record in the original text log format.
+  *
+  * Consecutive records usually share a timestamp, so the formatted date of
+  * the previous record is reused instead of calling ctime again.
+  */
+ static void writeRecordLine(ostream& out, const GameRecord& record) {
+     static int64_t lastTimestamp = -1;
+     static string lastDate;
+     if (record.timestamp != lastTimestamp) {
+         time_t when = static_cast<time_t>(record.timestamp);
+         char* dt = ctime(&when);
+         dt[strcspn(dt, "\n")] = 0;
+         lastDate = dt;
+         lastTimestamp = record.timestamp;
+     }
  
-     file << "[" << dt << "] Mode: " << mode
-          << ", Doors: " << doors
-          << ", Switched: " << (switched ? "Yes" : "No")
-          << ", Result: " << (won ? "Win" : "Loss") << "\n";
+     out << "[" << lastDate << "] Mode: " << gameModeName(record.mode)
+         << ", Doors: " << record.doors
+         << ", Switched: " << (record.switched ? "Yes" : "No")
+         << ", Result: " << (record.won ? "Win" : "Loss") << "\n";
+ }
  
-     file.close();
+ /**
+  * @brief Streams every record of the binary log through a callback.
+  *
+  * Flushes pending records first and reads the file in large blocks.
+  * @return Number of records read, or -1 if the log is missing or invalid.
+  */
+ template <typename Callback>
+ static long long forEachRecord(Callback callback) {
+     GameLog::instance().flush();
+ 
+     FILE* file = fopen(GAME_LOG_FILE, "rb");
+     if (!file) return -1;
+ 
+     char magic[GAME_LOG_HEADER_SIZE];
+     if (fread(magic, 1, GAME_LOG_HEADER_SIZE, file) != GAME_LOG_HEADER_SIZE ||
+         memcmp(magic, GAME_LOG_MAGIC, GAME_LOG_HEADER_SIZE) != 0) {
+         fclose(file);
+         return -1;
+     }
+ 
+     vector<GameRecord> block(4096);
+     long long count = 0;
+     size_t n;
+     while ((n = fread(block.data(), sizeof(GameRecord), block.size(), file)) > 0) {
+         for (size_t i = 0; i < n; ++i)
+             callback(block[i]);
+         count += n;
+     }
+     fclose(file);
+     return count;
  }
  
  /**
-  * @brief Displays all logged game history from file.
+  * @brief Displays summary statistics of the logged game history.
+  *
+  * Only records logged since the last call are scanned; everything older is
+  * read from the index in game_stats.idx.
   */
  void viewGameStats() {
-     ifstream file("game_stats.txt");
-     if (!file) {
+     GameHistory history;
+     if (history.update() < 0 || history.recordCount() == 0) {
          cout << "\nNo statistics recorded yet.\n";
          return;
      }
+     printHistorySummary(history);
+ }
  
-     cout << "\n=== Game History ===\n";
-     string line;
-     while (getline(file, line)) {
-         cout << line << "\n";
-     }
-     file.close();
+ /**
+  * @brief Exports the binary log as text lines in the original format.
+  */
+ long long exportGameLogText(const string& textPath) {
+     ofstream out(textPath);
+     if (!out) return -1;
+     long long count = forEachRecord([&out](const GameRecord& record) { writeRecordLine(out, record); });
+     return count < 0 ? 0 : count;
  }
  
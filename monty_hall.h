@@ -11,6 +11,40 @@
  
  #include <vector>
  #include <string>
+ #include <cstdint>
+ #include <cstddef>
+ 
+ /// Binary game log written by logGameResult
+ #define GAME_LOG_FILE "game_stats.bin"
+ 
+ /// Magic bytes at the start of the binary game log (format version 1)
+ #define GAME_LOG_MAGIC "MHLOG\x01\0"
+ 
+ /// Size in bytes of the binary game log header
+ const std::size_t GAME_LOG_HEADER_SIZE = 8;
+ 
+ /**
+  * @brief Game modes stored in the binary log.
+  */
+ enum GameMode : std::uint8_t {
+     MODE_INTERACTIVE = 0,
+     MODE_SIMULATION = 1
+ };
+ 
+ /**
+  * @struct GameRecord
+  * @brief One fixed-width (16-byte) entry of the binary game log, in host byte order.
+  */
+ struct GameRecord {
+     std::int64_t timestamp; ///< Seconds since the epoch
+     std::uint32_t doors;    ///< Number of doors used
+     std::uint8_t mode;      ///< A GameMode value
+     std::uint8_t switched;  ///< 1 if the player switched
+     std::uint8_t won;       ///< 1 if the player won
+     std::uint8_t reserved;  ///< Padding, always 0
+ };
+ 
+ static_assert(sizeof(GameRecord) == 16, "GameRecord must stay 16 bytes");
  
  /**
   * @class MontyHall
@@ -42,6 +76,16 @@
       */
      void runSimulation(int simulations);
  
+     /**
+      * @brief Simulates each strategy until its win rate is known to a given precision.
+      *
+      * Keeps running win counts and stops a strategy once the half-width of its
+      * 95% Wilson confidence interval is at most @p precision.
+      * @param precision Target half-width of the interval (e.g. 0.001); must be positive
+      * @param maxTrials Upper bound on rounds per strategy
+      */
+     void runAdaptiveSimulation(double precision, long long maxTrials = 100000000);
+ 
      /**
       * @brief Simulates a single game round internally.
       * @return True if player wins, false if not
@@ -49,8 +93,63 @@
      bool playSingleSimulation();
  };
  
+ /**
+  * @class GameLog
+  * @brief Buffered appender for the binary game log.
+  *
+  * Records are batched in memory and written with a single write per flush.
+  * The buffer is flushed when full, on flush(), and when the log is destroyed,
+  * so the shared instance() is written out when the process exits normally.
+  * Interactive games flush after every game. A failed flush keeps the
+  * records buffered and leaves the file as it was.
+  */
+ class GameLog {
+ private:
+     std::string path;                ///< Log file path
+     std::vector<GameRecord> buffer;  ///< Records not yet written
+     std::size_t capacity;            ///< Records buffered before an automatic flush
+ 
+ public:
+     /**
+      * @brief Creates a log appending to @p logPath.
+      * @param logPath Binary log file
+      * @param bufferedRecords Records buffered before writing to disk
+      */
+     explicit GameLog(const std::string& logPath = GAME_LOG_FILE, std::size_t bufferedRecords = 65536);
+ 
+     /**
+      * @brief Flushes any buffered records.
+      */
+     ~GameLog();
+ 
+     /**
+      * @brief Buffers a record, flushing if the buffer is full.
+      * @param record Record to append
+      */
+     void append(const GameRecord& record);
+ 
+     /**
+      * @brief Writes all buffered records to the log file.
+      * @return False if the file could not be written; the records stay buffered
+      */
+     bool flush();
+ 
+     /**
+      * @brief Returns the process-wide log used by logGameResult.
+      */
+     static GameLog& instance();
+ };
+ 
+ /**
+  * @brief Returns the display name of a GameMode ("Interactive", "Simulation").
+  */
+ const char* gameModeName(std::uint8_t mode);
+ 
  /**
   * @brief Prints ASCII door layout and game explanation.
+  *
+  * Doors wrap to the terminal width and long runs of closed doors are
+  * summarized on one line; the whole diagram is written at once.
   * @param numDoors Number of doors to display
   */
  void printIntroDiagram(int numDoors);
@@ -58,15 +157,18 @@
  /**
   * @brief Displays door layout in current game state.
   * @param numDoors Number of doors
-  * @param revealedGoats Doors Monty revealed as goats
-  * @param userPick User's door choice
+  * @param revealedGoats revealedGoats[i] is true if Monty revealed door i as a goat
+  * @param userPick User's door choice, marked with '*'
   * @param prize The winning door
   * @param final If true, show final reveal (CAR/GOAT)
   */
- void displayDoors(int numDoors, std::vector<int> revealedGoats = {}, int userPick = -1, int prize = -1, bool final = false);
+ void displayDoors(int numDoors, const std::vector<bool>& revealedGoats = {}, int userPick = -1, int prize = -1, bool final = false);
  
  /**
   * @brief Logs the result of a game or simulation round.
+  *
+  * Appends a GameRecord to the buffered binary log; nothing is written to
+  * disk until the buffer fills, the log is flushed, or the process exits.
   * @param mode "Interactive" or "Simulation"
   * @param doors Number of doors used
   * @param switched Whether the user switched
@@ -75,9 +177,19 @@
  void logGameResult(const std::string& mode, int doors, bool switched, bool won);
  
  /**
-  * @brief Displays the logged game history from file.
+  * @brief Displays win/loss totals from the logged game history.
+  *
+  * Uses the incrementally updated index in game_history.h, so only games
+  * logged since the last view are read from the log.
   */
  void viewGameStats();
  
+ /**
+  * @brief Writes the binary game log as text lines, one per game.
+  * @param textPath Output file
+  * @return Number of records exported, or -1 if the output could not be written
+  */
+ long long exportGameLogText(const std::string& textPath = "game_stats_export.txt");
+ 
  #endif // MONTY_HALL_H
  
\ No newline at end of file
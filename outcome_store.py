@@ -0,0 +1,280 @@
+"""
+Bit-packed per-trial outcome store.
+
+simulate() and runSimulation keep only win counters, and a trial_trace.py
+record costs 14 bytes a trial. An outcome store keeps one bit per strategy
+per trial, so 10^9 paired trials fit in 250 MB. Optionally it also keeps the
+prize, pick and reveal door of every trial, each in the smallest unsigned
+width the door count allows (one byte up to 256 doors).
+
+The file is a 32-byte header followed by one column per strategy and per
+stored index, each padded to 8 bytes. Both strategies are scored on the same
+games, exactly like simulate_paired() with the same seed. OutcomeReader maps
+the file and computes running win rates and block statistics with a byte
+popcount table, a chunk at a time, without unpacking the bits.
+
+    python outcome_store.py write outcomes.mho --doors 3 --trials 1e9 --seed 1
+    python outcome_store.py info outcomes.mho --block 1e6
+"""
+
+import argparse
+import math
+import struct
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import NormalDist
+
+import numpy as np
+
+from simulation import DEFAULT_CHUNK_SIZE, _check_game, _switch_wins, reveal_and_switch
+
+STORE_MAGIC = b"MHOUTS01"
+# magic, doors, opened, trials, strategies, index width in bytes (0 = none), index fields, reserved
+HEADER = struct.Struct("<8sIIQBBBB4x")
+STRATEGIES = ("switch", "stay")
+INDEX_FIELDS = ("prize", "pick", "reveal")
+ALIGN = 8
+# info splits a store into this many blocks unless --block is given
+DEFAULT_BLOCKS = 20
+
+# Set bits in every byte value
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def index_width(doors):
+    """Smallest unsigned width in bytes that holds every door index."""
+    return 1 if doors <= 1 << 8 else 2 if doors <= 1 << 16 else 4
+
+
+def _padded(size):
+    return -(-size // ALIGN) * ALIGN
+
+
+def _layout(trials, fields, width):
+    # (name, offset, bytes) of every column, in file order
+    columns = []
+    offset = HEADER.size
+    for name in STRATEGIES:
+        columns.append((name, offset, -(-trials // 8)))
+        offset += _padded(columns[-1][2])
+    for name in fields:
+        columns.append((name, offset, trials * width))
+        offset += _padded(columns[-1][2])
+    return columns, offset
+
+
+def write_store(path, doors=3, trials=1000, seed=None, rng=None, chunk_size=DEFAULT_CHUNK_SIZE, opened=1,
+                indices=False):
+    """Play `trials` paired rounds and write their outcomes to `path`.
+
+    With `indices`, the prize and pick of every trial are stored too, and the
+    revealed door when the host opens exactly one. Returns the file size.
+    """
+    doors = _check_game(doors, opened)
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    fields = (INDEX_FIELDS if opened == 1 else INDEX_FIELDS[:2]) if indices else ()
+    width = index_width(doors) if indices else 0
+    columns, size = _layout(trials, fields, width)
+    # Whole bytes per chunk, so each chunk packs into its own byte range
+    chunk_size = max(8, chunk_size // 8 * 8)
+
+    with open(path, "wb") as f:
+        f.truncate(size)
+    buffer = np.memmap(path, dtype=np.uint8, mode="r+", shape=(size,)) if trials else None
+    views = {}
+    for name, offset, length in columns if trials else ():
+        column = buffer[offset:offset + length]
+        views[name] = column if name in STRATEGIES else column.view(f"<u{width}")
+
+    for start in range(0, trials, chunk_size):
+        n = min(chunk_size, trials - start)
+        # Same draws as simulation.play_paired_chunk
+        prize = rng.integers(0, doors, n, dtype=np.int32)
+        pick = rng.integers(0, doors, n, dtype=np.int32)
+        if opened == 1:
+            reveal, target = reveal_and_switch(doors, prize, pick, rng)
+            switch = target == prize
+        else:
+            reveal = None
+            switch = _switch_wins(doors, prize, pick, rng, opened)
+
+        byte = start // 8
+        for name, won in (("switch", switch), ("stay", prize == pick)):
+            packed = np.packbits(won, bitorder="little")
+            views[name][byte:byte + len(packed)] = packed
+        for name, values in (("prize", prize), ("pick", pick), ("reveal", reveal)):
+            if name in views:
+                views[name][start:start + n] = values
+
+    if buffer is not None:
+        buffer.flush()
+        del buffer, views
+    # The header goes in last, so an interrupted write never looks complete
+    flags = sum(1 << INDEX_FIELDS.index(name) for name in fields)
+    with open(path, "r+b") as f:
+        f.write(HEADER.pack(STORE_MAGIC, doors, opened, trials, len(STRATEGIES), width, flags, 0))
+    return size
+
+
+@dataclass
+class BlockStats:
+    """Win rates of consecutive blocks of `block_size` trials of one strategy."""
+
+    strategy: str
+    block_size: int
+    rates: np.ndarray
+
+    @property
+    def blocks(self):
+        return len(self.rates)
+
+    @property
+    def mean(self):
+        return float(self.rates.mean()) if self.blocks else 0.0
+
+    @property
+    def std(self):
+        """Sample spread of the block rates; NaN with fewer than two blocks."""
+        return float(self.rates.std(ddof=1)) if self.blocks > 1 else math.nan
+
+    def interval(self, confidence=0.95):
+        """Batch-means interval for the win rate, from the spread of the block rates.
+
+        One block says nothing about the spread, so with fewer than two
+        blocks both ends are NaN.
+        """
+        if self.blocks < 2:
+            return math.nan, math.nan
+        half = NormalDist().inv_cdf((1 + confidence) / 2) * self.std / math.sqrt(self.blocks)
+        return self.mean - half, self.mean + half
+
+
+class OutcomeReader:
+    """Memory-mapped view of an outcome store.
+
+    Win counts come straight from the packed bytes; nothing larger than
+    `chunk_size` bytes is ever materialized.
+    """
+
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        with open(path, "rb") as f:
+            magic, doors, opened, trials, strategies, width, flags, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != STORE_MAGIC:
+            raise ValueError(f"{path} is not a Monty Hall outcome store (or its write did not finish)")
+        if strategies != len(STRATEGIES):
+            raise ValueError(f"{path} stores {strategies} strategies, expected {len(STRATEGIES)}")
+        self.doors, self.opened, self.trials = doors, opened, trials
+        self.chunk_size = chunk_size
+        self.fields = tuple(name for i, name in enumerate(INDEX_FIELDS) if flags & (1 << i))
+        columns, size = _layout(trials, self.fields, width)
+        if Path(path).stat().st_size < size:
+            raise ValueError(f"{path} is truncated")
+        buffer = np.memmap(path, dtype=np.uint8, mode="r", shape=(size,))
+        self.columns = {}
+        for name, offset, length in columns:
+            column = buffer[offset:offset + length]
+            self.columns[name] = column if name in STRATEGIES else column.view(f"<u{width}")
+
+    def column(self, name):
+        """Mapped prize/pick/reveal indices, or the packed win bits of a strategy."""
+        if name not in self.columns:
+            raise KeyError(f"{name!r} is not stored; available: {', '.join(self.columns)}")
+        return self.columns[name]
+
+    def outcomes(self, strategy, start=0, stop=None):
+        """Unpacked win flags of trials [start, stop) as a boolean array."""
+        stop = self.trials if stop is None else min(stop, self.trials)
+        packed = self.column(strategy)[start // 8:-(-stop // 8)]
+        bits = np.unpackbits(packed, bitorder="little")
+        return bits[start % 8:start % 8 + stop - start].astype(bool)
+
+    def wins(self, strategy, start=0, stop=None):
+        """Wins of `strategy` over trials [start, stop)."""
+        stop = self.trials if stop is None else min(stop, self.trials)
+        if stop - start < 16:
+            return int(np.count_nonzero(self.outcomes(strategy, start, stop)))
+        # Ragged edges bit by bit, whole bytes through the popcount table
+        first, last = -(-start // 8), stop // 8
+        total = int(np.count_nonzero(self.outcomes(strategy, start, first * 8)))
+        total += int(np.count_nonzero(self.outcomes(strategy, last * 8, stop)))
+        packed = self.column(strategy)
+        for i in range(first, last, self.chunk_size):
+            total += int(POPCOUNT[packed[i:min(i + self.chunk_size, last)]].sum(dtype=np.int64))
+        return total
+
+    def running_rates(self, strategy, points):
+        """Win rate over the first n trials for each n in `points` (sorted ascending)."""
+        rates = np.zeros(len(points))
+        wins = previous = 0
+        for i, n in enumerate(points):
+            n = min(int(n), self.trials)
+            wins += self.wins(strategy, previous, n)
+            previous = n
+            rates[i] = wins / n if n else 0.0
+        return rates
+
+    def block_stats(self, strategy, block_size):
+        """BlockStats over whole blocks of `block_size` trials (a multiple of 8)."""
+        block_size = int(block_size)
+        if block_size <= 0 or block_size % 8:
+            raise ValueError("block size must be a positive multiple of 8")
+        block_bytes = block_size // 8
+        blocks = self.trials // block_size
+        packed = self.column(strategy)
+        per_chunk = max(1, self.chunk_size // block_bytes)
+        wins = np.empty(blocks, dtype=np.int64)
+        for b in range(0, blocks, per_chunk):
+            n = min(per_chunk, blocks - b)
+            chunk = packed[b * block_bytes:(b + n) * block_bytes].reshape(n, block_bytes)
+            wins[b:b + n] = POPCOUNT[chunk].sum(axis=1, dtype=np.int64)
+        return BlockStats(strategy, block_size, wins / block_size)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bit-packed Monty Hall outcome stores")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    write = sub.add_parser("write", help="simulate paired rounds and store their outcomes")
+    write.add_argument("path")
+    write.add_argument("--doors", type=int, default=3, help="number of doors (minimum 3)")
+    write.add_argument("--trials", type=float, default=1e6, help="rounds to store")
+    write.add_argument("--seed", type=int, default=None, help="seed for a reproducible store")
+    write.add_argument("--opened", type=int, default=1, help="goat doors the host opens")
+    write.add_argument("--indices", action="store_true", help="also store prize/pick/reveal doors")
+
+    info = sub.add_parser("info", help="print a store's win rates and block statistics")
+    info.add_argument("path")
+    info.add_argument("--block", type=float, default=None,
+                      help=f"trials per block, rounded down to a multiple of 8 (default: {DEFAULT_BLOCKS} blocks)")
+
+    args = parser.parse_args(argv)
+    if args.command == "write":
+        size = write_store(args.path, args.doors, int(args.trials), args.seed, opened=args.opened,
+                           indices=args.indices)
+        print(f"Wrote {size / 2**20:.1f} MiB to {args.path}")
+
+    reader = OutcomeReader(args.path)
+    print(f"Doors: {reader.doors}, Opened: {reader.opened}, Trials: {reader.trials}, "
+          f"Indices: {', '.join(reader.fields) or 'none'}")
+    requested = getattr(args, "block", None)
+    if requested is None:
+        block = max(8, reader.trials // DEFAULT_BLOCKS // 8 * 8)
+    else:
+        block = max(8, int(requested) // 8 * 8)
+        if block != int(requested):
+            print(f"warning: --block {int(requested)} rounded to {block}, a multiple of 8", file=sys.stderr)
+    for strategy in STRATEGIES:
+        stats = reader.block_stats(strategy, block)
+        rate = reader.wins(strategy) / reader.trials if reader.trials else 0.0
+        if stats.blocks < 2:
+            spread = "too few for an interval"
+        else:
+            low, high = stats.interval()
+            spread = f"std {stats.std:.4f}, 95% [{low:.4f}, {high:.4f}]"
+        print(f"{strategy.capitalize():<6} win rate: {rate:.4f}  {stats.blocks} blocks of {block}: {spread}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Opt-in per-play profiling for the scenes in animations.py.
+
+Set MONTY_PROFILE=1 (or MONTY_PROFILE=<output dir>) before rendering and
+every self.play/self.wait of every scene is recorded with its wall time,
+frame count, mobject count, time spent drawing frames and encoding them,
+and the Tex/Text cache hits and misses it caused. The time spent building
+mobjects between two plays is recorded as a "build" span, with LaTeX
+compiles, Text rasterization and SVG parsing as nested spans. Each scene
+writes a Chrome trace (open in chrome://tracing or ui.perfetto.dev) to
+media/profiles/<Scene>.trace.json.
+
+When MONTY_PROFILE is unset nothing is patched, so rendering runs the
+unmodified manim code paths.
+
+    MONTY_PROFILE=1 python render.py ProbabilityVsN --workers 1
+    python profiling.py media/profiles/ProbabilityVsN.trace.json
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ENV_VAR = "MONTY_PROFILE"
+DEFAULT_OUTPUT_DIR = Path("media") / "profiles"
+
+COUNTERS = ("tex_requests", "tex_misses", "text_requests", "text_misses", "svg_parses", "render_s", "encode_s")
+
+_output_dir = None
+_active = None
+
+
+def _now_us():
+    return time.perf_counter() * 1e6
+
+
+class SceneProfile:
+    """Timeline of one scene render, in Chrome trace event format."""
+
+    def __init__(self, scene_name):
+        self.scene_name = scene_name
+        self.events = []
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.start = _now_us()
+        self.mark = self.start
+        self.mark_counters = dict(self.counters)
+
+    def span(self, name, category, start, end, args=None):
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round(start - self.start, 1),
+                "dur": round(end - start, 1),
+                "pid": 1,
+                "tid": 1,
+                "args": args or {},
+            }
+        )
+
+    def deltas(self):
+        # Counter changes since the last mark, then move the mark forward
+        deltas = {k: round(self.counters[k] - self.mark_counters[k], 6) for k in COUNTERS}
+        self.mark_counters = dict(self.counters)
+        return deltas
+
+    def write(self, output_dir):
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / f"{self.scene_name}.trace.json"
+        trace = {
+            "traceEvents": self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"scene": self.scene_name, "totals": self.counters},
+        }
+        path.write_text(json.dumps(trace))
+        return path
+
+
+def _wrap(owner, name, before=None, after=None):
+    # Replace owner.name with a wrapper that calls before(*args) and
+    # after(state, result, start, *args) around it while a profile is active
+    original = getattr(owner, name, None)
+    if original is None or getattr(original, "_monty_profiled", False):
+        return
+
+    def wrapper(*args, **kwargs):
+        if _active is None:
+            return original(*args, **kwargs)
+        state = before(*args) if before else None
+        start = _now_us()
+        result = original(*args, **kwargs)
+        if after:
+            after(state, result, start, *args)
+        return result
+
+    wrapper._monty_profiled = True
+    setattr(owner, name, wrapper)
+
+
+def _count(key, span=None, category="cache"):
+    def after(state, result, start, *args):
+        if key:
+            _active.counters[key] += 1
+        if span:
+            _active.span(span, category, start, _now_us())
+
+    return after
+
+
+def _accumulate(key):
+    def after(state, result, start, *args):
+        _active.counters[key] += (_now_us() - start) / 1e6
+
+    return after
+
+
+def _before_play(scene, *args):
+    # Close the build span covering everything since the previous play
+    now = _now_us()
+    if now > _active.mark:
+        _active.span("build", "build", _active.mark, now, _active.deltas())
+    else:
+        _active.deltas()
+    return scene.renderer.time
+
+
+def _after_play():
+    def after(start_time, result, start, scene, *args):
+        from manim import config
+
+        end = _now_us()
+        names = [type(a).__name__ for a in args if not isinstance(a, (int, float))]
+        # Scene.wait() is a play() of a single Wait animation
+        kind = "wait" if names and all(name == "Wait" for name in names) else "play"
+        info = _active.deltas()
+        info.update(
+            {
+                "frames": round((scene.renderer.time - start_time) * config.frame_rate),
+                "mobjects": len(scene.mobjects),
+                "family_size": sum(len(m.get_family()) for m in scene.mobjects),
+                "animations": names,
+            }
+        )
+        _active.span(kind if kind == "wait" or not names else f"play: {', '.join(names)}", kind, start, end, info)
+        _active.mark = end
+
+    return after
+
+
+def enable(output_dir=None):
+    """Patch manim so every scene render records a profile. Safe to call twice."""
+    global _output_dir
+    _output_dir = Path(output_dir) if output_dir else DEFAULT_OUTPUT_DIR
+
+    import manimpango
+    from manim.mobject.svg.svg_mobject import SVGMobject
+    from manim.mobject.text import tex_mobject, text_mobject
+    from manim.renderer.cairo_renderer import CairoRenderer
+    from manim.scene.scene import Scene
+    from manim.scene.scene_file_writer import SceneFileWriter
+    from manim.utils import tex_file_writing
+
+    original_render = Scene.render
+    if not getattr(original_render, "_monty_profiled", False):
+
+        def render(self, *args, **kwargs):
+            global _active
+            if _output_dir is None:
+                return original_render(self, *args, **kwargs)
+            _active = SceneProfile(type(self).__name__)
+            try:
+                return original_render(self, *args, **kwargs)
+            finally:
+                profile, _active = _active, None
+                profile.span("build", "build", profile.mark, _now_us(), profile.deltas())
+                profile.write(_output_dir)
+
+        render._monty_profiled = True
+        Scene.render = render
+
+    # Not Scene.wait: it goes through play(), and would record every wait twice
+    _wrap(Scene, "play", _before_play, _after_play())
+
+    _wrap(tex_file_writing, "tex_to_svg_file", after=_count("tex_requests"))
+    tex_mobject.tex_to_svg_file = tex_file_writing.tex_to_svg_file
+    _wrap(tex_file_writing, "compile_tex", after=_count("tex_misses", "tex compile", "tex"))
+    _wrap(tex_file_writing, "convert_to_svg", after=_count(None, "tex to svg", "tex"))
+    _wrap(text_mobject.Text, "_text2svg", after=_count("text_requests"))
+    _wrap(manimpango, "text2svg", after=_count("text_misses", "text rasterize", "text"))
+    _wrap(SVGMobject, "generate_mobject", after=_count("svg_parses", "svg parse", "svg"))
+
+    _wrap(CairoRenderer, "update_frame", after=_accumulate("render_s"))
+    _wrap(SceneFileWriter, "write_frame", after=_accumulate("encode_s"))
+
+
+def disable():
+    """Stop recording profiles; the patches stay in place but do nothing."""
+    global _output_dir
+    _output_dir = None
+
+
+def install_from_env():
+    """Enable profiling if MONTY_PROFILE is set; otherwise do nothing."""
+    value = os.environ.get(ENV_VAR, "")
+    if value and value.lower() not in ("0", "false", "no"):
+        enable(None if value.lower() in ("1", "true", "yes") else value)
+
+
+def summarize(path):
+    """Per-category totals and the slowest plays of a written trace."""
+    trace = json.loads(Path(path).read_text())
+    events = trace["traceEvents"]
+    by_category = defaultdict(lambda: [0, 0.0])
+    for e in events:
+        by_category[e["cat"]][0] += 1
+        by_category[e["cat"]][1] += e["dur"] / 1e6
+
+    lines = [f"=== {trace['otherData']['scene']} ==="]
+    for category, (count, seconds) in sorted(by_category.items(), key=lambda kv: -kv[1][1]):
+        lines.append(f"{category:<8} {count:>6} spans {seconds:>9.2f}s")
+    totals = trace["otherData"]["totals"]
+    lines.append(
+        f"Tex cache: {totals['tex_requests'] - totals['tex_misses']} hits, {totals['tex_misses']} misses; "
+        f"Text cache: {totals['text_requests'] - totals['text_misses']} hits, {totals['text_misses']} misses"
+    )
+    lines.append("Slowest plays:")
+    plays = sorted((e for e in events if e["cat"] in ("play", "wait")), key=lambda e: -e["dur"])
+    for e in plays[:10]:
+        lines.append(f"  {e['dur'] / 1e6:>7.2f}s {e['args']['frames']:>5} frames  {e['name']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize scene profiles written with MONTY_PROFILE")
+    parser.add_argument("traces", nargs="+", help="media/profiles/<Scene>.trace.json files")
+    args = parser.parse_args(argv)
+    for path in args.traces:
+        print(summarize(path))
+
+
+if __name__ == "__main__":
+    main()
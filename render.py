@@ -0,0 +1,525 @@
+"""
+Parallel render orchestrator for the scenes in animations.py.
+
+Renders all (or selected) scenes in a process pool, one fresh worker process
+per scene, sharing the media/Tex and media/texts caches between workers
+under file locks. Writes a JSON manifest with per-scene timings and joins
+the scene videos, in order, into one final video with ffmpeg.
+
+Each scene gets a content hash of its source, the helper modules and assets
+it uses and the render settings. Scenes whose hash matches their last
+successful render are skipped, and --watch re-renders only the scenes a saved
+file actually affects.
+
+    python render.py                      # every scene, all cores
+    python render.py Classic3DoorVersion MarilynScene --quality low_quality
+    python render.py --watch --quality low_quality
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import profiling
+from locks import file_lock
+
+ROOT = Path(__file__).resolve().parent
+SCENES_FILE = ROOT / "animations.py"
+MEDIA_DIR = ROOT / "media"
+MANIFEST_FILE = MEDIA_DIR / "render_manifest.json"
+DEFAULT_QUALITY = "high_quality"
+DEFAULT_OUTPUT = MEDIA_DIR / "videos" / "monty_hall_full.mp4"
+
+# Bump to invalidate every scene hash, e.g. after changing how scenes render
+HASH_VERSION = 1
+# Assets larger than this are hashed by size and mtime instead of content
+LARGE_ASSET_BYTES = 64 << 20
+WATCH_INTERVAL = 0.5
+
+
+def list_scenes(path=SCENES_FILE):
+    """Scene class names in `path`, in source order, found without importing manim."""
+    tree = ast.parse(Path(path).read_text(encoding="utf-8"))
+    scenes = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        bases = {b.id for b in node.bases if isinstance(b, ast.Name)}
+        if bases & ({"Scene", "MovingCameraScene", "ThreeDScene"} | set(scenes)):
+            scenes.append(node.name)
+    return scenes
+
+
+def _variant(node):
+    # True for a class whose body sets IN_FULL_VIDEO = False
+    for stmt in node.body:
+        if (
+            isinstance(stmt, ast.Assign)
+            and any(isinstance(t, ast.Name) and t.id == "IN_FULL_VIDEO" for t in stmt.targets)
+            and isinstance(stmt.value, ast.Constant)
+        ):
+            return not stmt.value.value
+    return False
+
+
+def full_video_scenes(path=SCENES_FILE):
+    """list_scenes() without the variant scenes marked IN_FULL_VIDEO = False.
+
+    Variants such as ProbabilityVsNSweep retell a segment of the video
+    another way; they render by name but are not part of the default run.
+    """
+    tree = ast.parse(Path(path).read_text(encoding="utf-8"))
+    variants = {node.name for node in tree.body if isinstance(node, ast.ClassDef) and _variant(node)}
+    return [name for name in list_scenes(path) if name not in variants]
+
+
+def _locked(func, lock_dir, key_func):
+    def wrapper(*args, **kwargs):
+        key = hashlib.sha256(key_func(*args, **kwargs).encode()).hexdigest()[:16]
+        with file_lock(lock_dir / f"{key}.lock"):
+            return func(*args, **kwargs)
+
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def _text_key(self, color=None, *args, **kwargs):
+    # The hash manim names the cached SVG after, so only identical texts share a lock
+    if hasattr(self, "_text2hash"):
+        return self._text2hash(color)
+    return repr(tuple(str(getattr(self, name, None)) for name in ("text", "font", "font_size", "weight", "slant"))
+                + (str(color),))
+
+
+def install_cache_locks(media_dir=MEDIA_DIR):
+    """Make manim's Tex and Text file caches safe to share between processes.
+
+    Two workers compiling the same formula would otherwise race on the same
+    .tex/.dvi/.svg files. Each compile is wrapped in a lock keyed by its
+    input, so distinct formulas still compile in parallel while identical
+    ones are compiled once and then read from the cache.
+    """
+    from manim.mobject.text import tex_mobject, text_mobject
+    from manim.utils import tex_file_writing
+
+    lock_dir = Path(media_dir) / "locks"
+    if not hasattr(tex_file_writing.tex_to_svg_file, "__wrapped__"):
+        locked = _locked(
+            tex_file_writing.tex_to_svg_file,
+            lock_dir,
+            lambda expression, environment=None, tex_template=None: repr(
+                (expression, environment, getattr(tex_template, "body", None))
+            ),
+        )
+        tex_file_writing.tex_to_svg_file = locked
+        tex_mobject.tex_to_svg_file = locked
+
+    text2svg = text_mobject.Text._text2svg
+    if not hasattr(text2svg, "__wrapped__"):
+        text_mobject.Text._text2svg = _locked(text2svg, lock_dir, _text_key)
+
+
+def _local_module(name, root):
+    path = Path(root) / f"{name.split('.')[0]}.py"
+    return path if path.is_file() else None
+
+
+def _module_deps(path, root, found):
+    # Add the project modules imported by `path`, transitively, to `found`
+    for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+        if isinstance(node, ast.Import):
+            names = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            dep = _local_module(name, root)
+            if dep is not None and dep not in found:
+                found.add(dep)
+                _module_deps(dep, root, found)
+    return found
+
+
+def _assets(value, root):
+    # Files named by a string constant: the file itself, or a directory's files
+    if not value or "\n" in value or len(value) > 255:
+        return []
+    try:
+        path = Path(root) / value
+        if path.is_file():
+            return [path]
+        if path.is_dir() and path != Path(root):
+            return [p for p in path.rglob("*") if p.is_file()]
+    except (OSError, ValueError):
+        pass
+    return []
+
+
+def scene_dependencies(name, scenes_file=SCENES_FILE):
+    """(source segments, files) that scene `name` depends on.
+
+    Segments are the scene class, its base classes in the same file and the
+    module-level statements other than classes. Files are the project
+    modules whose names the scene uses (with their own project imports) and
+    files or directories named by string constants in the scene, such as
+    marilyn.png.
+    """
+    scenes_file = Path(scenes_file)
+    root = scenes_file.parent
+    text = scenes_file.read_text(encoding="utf-8")
+    tree = ast.parse(text)
+    classes = {n.name: n for n in tree.body if isinstance(n, ast.ClassDef)}
+    if name not in classes:
+        raise ValueError(f"unknown scene: {name}")
+
+    segments, files = [], set()
+    imported = {}  # module-level name -> project module it comes from
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            continue
+        segments.append(ast.get_source_segment(text, node))
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                path = _local_module(alias.name, root)
+                if path is not None:
+                    imported[alias.asname or alias.name.split(".")[0]] = path
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            path = _local_module(node.module, root)
+            if path is not None:
+                for alias in node.names:
+                    imported[alias.asname or alias.name] = path
+
+    chain, node = [], classes[name]
+    while node is not None and node not in chain:
+        chain.append(node)
+        node = next((classes[b.id] for b in node.bases if isinstance(b, ast.Name) and b.id in classes), None)
+
+    for node in chain:
+        segments.append(ast.get_source_segment(text, node))
+        for sub in ast.walk(node):
+            if isinstance(sub, ast.Name) and sub.id in imported:
+                files.add(imported[sub.id])
+            elif isinstance(sub, ast.Constant) and isinstance(sub.value, str):
+                files.update(_assets(sub.value, root))
+
+    for path in [f for f in files if f.suffix == ".py"]:
+        _module_deps(path, root, files)
+    return segments, files
+
+
+def _file_digest(path):
+    stat = path.stat()
+    if stat.st_size > LARGE_ASSET_BYTES:
+        return repr((stat.st_size, stat.st_mtime_ns)).encode()
+    return hashlib.sha256(path.read_bytes()).digest()
+
+
+def _manim_version():
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("manim")
+    except PackageNotFoundError:
+        return None
+
+
+def scene_hash(name, quality=DEFAULT_QUALITY, scenes_file=SCENES_FILE, options=None):
+    """Content hash of everything that decides what scene `name` renders.
+
+    `options` are the extra render_scene() keyword arguments, if any.
+    """
+    root = Path(scenes_file).parent
+    segments, files = scene_dependencies(name, scenes_file)
+    settings = (HASH_VERSION, name, quality, _manim_version(), sorted((options or {}).items()))
+    digest = hashlib.sha256(repr(settings).encode())
+    for segment in segments:
+        digest.update(segment.encode() + b"\0")
+    for path in sorted(files):
+        digest.update(path.relative_to(root).as_posix().encode() + b"\0")
+        digest.update(_file_digest(path))
+    return digest.hexdigest()
+
+
+def _load_scenes_module(path):
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location(Path(path).stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def render_scene(
+    name,
+    quality=DEFAULT_QUALITY,
+    media_dir=MEDIA_DIR,
+    scenes_file=SCENES_FILE,
+    single_stream=False,
+    frame_digest=False,
+    profile=False,
+):
+    """Render one scene in this process and return its manifest entry.
+
+    With `single_stream`, or for scenes with SINGLE_STREAM = True, the scene
+    is encoded in one ffmpeg session (see stream_writer.py). `frame_digest`
+    adds a hash of every frame sent to the encoder to the entry, with
+    manim's animation cache off so every frame is drawn. `profile` writes a
+    profiling.py trace to media/profiles.
+    """
+    entry = {"scene": name, "ok": False, "output": None, "error": None}
+    start = time.perf_counter()
+    try:
+        # Scenes load assets such as marilyn.png and helper modules such as
+        # door_factory.py relative to the project root
+        os.chdir(Path(scenes_file).parent)
+        if str(Path(scenes_file).parent) not in sys.path:
+            sys.path.insert(0, str(Path(scenes_file).parent))
+
+        from manim import tempconfig
+
+        install_cache_locks(media_dir)
+        if profile:
+            profiling.enable(Path(media_dir) / "profiles")
+        module = _load_scenes_module(scenes_file)
+        settings = {"quality": quality, "media_dir": str(media_dir)}
+        if frame_digest:
+            settings["disable_caching"] = True
+        with tempconfig(settings):
+            scene_class = getattr(module, name)
+            if single_stream or getattr(scene_class, "SINGLE_STREAM", False):
+                from stream_writer import make_scene
+
+                scene = make_scene(scene_class)
+                entry["single_stream"] = True
+            else:
+                scene = scene_class()
+            if frame_digest:
+                from stream_writer import add_frame_digest
+
+                digest = add_frame_digest(scene)
+            scene.render()
+            entry["output"] = str(scene.renderer.file_writer.movie_file_path)
+            if frame_digest:
+                entry["frame_digest"] = digest.hexdigest()
+        entry["ok"] = True
+    except Exception as exc:
+        entry["error"] = f"{type(exc).__name__}: {exc}"
+    finally:
+        if profile:
+            # A render daemon keeps running; its next job may not want a profile
+            profiling.disable()
+    entry["seconds"] = round(time.perf_counter() - start, 3)
+    return entry
+
+
+def _previous_entries(manifest_file=MANIFEST_FILE):
+    try:
+        data = json.loads(Path(manifest_file).read_text())
+    except (OSError, ValueError):
+        return {}
+    return {e["scene"]: e for e in data.get("scenes", [])}
+
+
+def _unchanged(entry, scene_hash):
+    return (
+        entry is not None
+        and entry.get("ok")
+        and entry.get("hash") == scene_hash
+        and entry.get("output")
+        and Path(entry["output"]).exists()
+    )
+
+
+def concat_videos(paths, output):
+    """Join videos with ffmpeg's concat demuxer, without re-encoding."""
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    list_file = output.with_suffix(".txt")
+    list_file.write_text("".join(f"file '{Path(p).resolve().as_posix()}'\n" for p in paths))
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+         "-i", str(list_file), "-c", "copy", str(output)],
+        check=True,
+    )
+    list_file.unlink()
+    return output
+
+
+def render_all(
+    scenes=None,
+    quality=DEFAULT_QUALITY,
+    workers=None,
+    output=DEFAULT_OUTPUT,
+    concat=True,
+    force=False,
+    daemon=False,
+    options=None,
+):
+    """Render changed scenes in parallel, write the manifest and join the videos in order.
+
+    Scenes whose content hash matches their last successful render are
+    skipped unless `force` is set. The rest are submitted longest-first
+    using the previous manifest's timings, so the slowest scenes do not end
+    up starting last. With `daemon`, they are sent one by one to a running
+    render_daemon.py instead of the process pool. `options` are passed
+    on to render_scene(); all but `profile` are part of the scene hash.
+    """
+    options = options or {}
+    scenes = scenes or full_video_scenes()
+    unknown = set(scenes) - set(list_scenes())
+    if unknown:
+        raise ValueError(f"unknown scenes: {', '.join(sorted(unknown))}")
+
+    start = time.perf_counter()
+    previous = _previous_entries()
+    # A profiled render writes the same video, so it does not change the hash
+    hashed_options = {k: v for k, v in options.items() if k != "profile"}
+    hashes = {name: scene_hash(name, quality, options=hashed_options) for name in scenes}
+    entries = {}
+    for name in scenes:
+        if not force and _unchanged(previous.get(name), hashes[name]):
+            entries[name] = dict(previous[name], skipped=True)
+            print(f"{name:<24} {'':>9}  unchanged", flush=True)
+
+    pending = [name for name in scenes if name not in entries]
+    order = sorted(pending, key=lambda s: -previous.get(s, {}).get("seconds", float("inf")))
+    workers = min(workers or os.cpu_count() or 1, max(len(pending), 1))
+
+    def record(entry):
+        entry.update(hash=hashes[entry["scene"]], skipped=False)
+        entries[entry["scene"]] = entry
+        status = "ok" if entry["ok"] else f"FAILED ({entry['error']})"
+        print(f"{entry['scene']:<24} {entry['seconds']:>8.1f}s  {status}", flush=True)
+
+    if pending and daemon:
+        import render_daemon
+
+        if not render_daemon.is_running():
+            raise RuntimeError("no render daemon running; start one with: python render_daemon.py start")
+        workers = 1
+        for name in order:
+            try:
+                record(render_daemon.render(name, quality, **options))
+            except OSError as exc:
+                raise RuntimeError(f"lost the render daemon while rendering {name}: {exc}") from exc
+    elif pending:
+        # One process per scene keeps manim's global config and caches isolated
+        with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+            futures = {pool.submit(render_scene, name, quality, **options): name for name in order}
+            for future in as_completed(futures):
+                record(future.result())
+
+    ordered = [entries[name] for name in scenes]
+    final = None
+    if concat and all(e["ok"] for e in ordered):
+        final = str(concat_videos([e["output"] for e in ordered], output))
+
+    manifest = {
+        "quality": quality,
+        "workers": workers,
+        "wall_seconds": round(time.perf_counter() - start, 3),
+        # Scenes outside this run keep their last entry, so they can still be skipped later
+        "scenes": ordered + [e for name, e in previous.items() if name not in entries],
+        "output": final,
+    }
+    MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+    MANIFEST_FILE.write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def _mtimes(paths):
+    return {p: p.stat().st_mtime_ns if p.exists() else None for p in paths}
+
+
+def _watched_files(scenes, scenes_file=SCENES_FILE):
+    try:
+        files = {Path(scenes_file)}
+        for name in scenes or full_video_scenes(scenes_file):
+            files |= scene_dependencies(name, scenes_file)[1]
+        return files
+    except (SyntaxError, ValueError):
+        # Mid-edit: watch every module until the scenes file parses again
+        return set(Path(scenes_file).parent.glob("*.py"))
+
+
+def watch(scenes=None, quality=DEFAULT_QUALITY, workers=None, output=DEFAULT_OUTPUT, concat=True,
+          interval=WATCH_INTERVAL, daemon=False, options=None, force=False):
+    """Render, then re-render the affected scenes every time a watched file changes.
+
+    Watched files are animations.py and every helper module and asset its
+    scenes depend on. A change re-runs render_all, which skips the scenes
+    whose hash did not change. `force` re-renders every scene on the first
+    pass only. Stops on Ctrl+C.
+    """
+    snapshot = None
+    try:
+        while True:
+            current = _mtimes(_watched_files(scenes))
+            if current != snapshot:
+                if snapshot is not None:
+                    print("\nChange detected, re-rendering...", flush=True)
+                snapshot = current
+                try:
+                    manifest = render_all(scenes, quality, workers, output, concat, force, daemon, options)
+                    force = False
+                    print(f"Done in {manifest['wall_seconds']:.1f}s. Watching for changes (Ctrl+C to stop)", flush=True)
+                except (SyntaxError, ValueError, RuntimeError) as exc:
+                    # A half-saved edit or a stopped daemon; wait for the next save
+                    print(f"Skipping render: {type(exc).__name__}: {exc}", flush=True)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render animations.py scenes in parallel")
+    parser.add_argument("scenes", nargs="*", help="scenes to render (default: all, in file order)")
+    parser.add_argument("--quality", default=DEFAULT_QUALITY, help="manim quality, e.g. low_quality")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="final concatenated video")
+    parser.add_argument("--no-concat", action="store_true", help="skip joining the scene videos")
+    parser.add_argument("--list", action="store_true", help="list scenes and exit")
+    parser.add_argument("--profile", action="store_true", help="write per-play traces to media/profiles")
+    parser.add_argument("--force", action="store_true", help="re-render scenes even if unchanged")
+    parser.add_argument("--watch", action="store_true", help="re-render affected scenes on every file change")
+    parser.add_argument("--daemon", action="store_true", help="render through a running render_daemon.py")
+    parser.add_argument("--single-stream", action="store_true", help="encode every scene in one ffmpeg session")
+    parser.add_argument("--frame-digest", action="store_true", help="record a hash of every scene's frames")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        included = set(full_video_scenes())
+        for name in list_scenes():
+            print(name if name in included else f"{name}  (variant, not in the full video)")
+        return 0
+    options = {k: True for k in ("single_stream", "frame_digest", "profile") if getattr(args, k)}
+    # Unchanged scenes would be skipped and write no profile
+    force = args.force or args.profile
+    if args.watch:
+        watch(args.scenes, args.quality, args.workers, args.output, not args.no_concat, daemon=args.daemon,
+              options=options, force=force)
+        return 0
+
+    try:
+        manifest = render_all(
+            args.scenes, args.quality, args.workers, args.output, not args.no_concat, force, args.daemon, options
+        )
+    except RuntimeError as exc:
+        print(f"Error: {exc}")
+        return 1
+    print(f"Wall time: {manifest['wall_seconds']:.1f}s  Manifest: {MANIFEST_FILE}")
+    if manifest["output"]:
+        print(f"Final video: {manifest['output']}")
+    return 0 if all(e["ok"] for e in manifest["scenes"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Warm render daemon for the scenes in animations.py.
+
+render.py starts a fresh process for every scene, which pays for importing
+manim and for cold in-memory caches before the first frame. The daemon
+imports manim once and renders jobs sent over a local socket one after
+another, so parsed Tex/Text SVGs and door_factory templates stay in memory
+between jobs. Project modules edited since the last job are reloaded and
+animations.py is re-read for every job, so edits show up without a restart.
+
+Each job runs under its own manim tempconfig and its errors are sent back to
+the client without stopping the daemon. With --fork (POSIX only) each job
+runs in a forked copy of the warm process, so even a crash or leaked global
+state only affects that job, at the cost of not keeping its caches.
+
+    python render_daemon.py start &
+    python render_daemon.py render MarilynScene --quality low_quality
+    python render.py --daemon --watch --quality low_quality
+    python render_daemon.py stop
+"""
+
+import argparse
+import importlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import time
+from pathlib import Path
+
+from render import DEFAULT_QUALITY, MEDIA_DIR, ROOT, SCENES_FILE, _load_scenes_module, install_cache_locks, render_scene
+
+SOCKET_PATH = MEDIA_DIR / "render_daemon.sock"
+# Used where Unix sockets are unavailable
+TCP_ADDRESS = ("127.0.0.1", 8315)
+UNIX = hasattr(socket, "AF_UNIX")
+# render_scene() flags a client may set; paths always come from the daemon
+CLIENT_OPTIONS = {"single_stream", "frame_digest", "profile"}
+
+
+def _refresh_modules(mtimes):
+    # Reload project modules edited since the last job, e.g. door_factory.py
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if name in ("__main__", __name__, "render") or not path or Path(path).parent != ROOT:
+            continue
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        if mtimes.setdefault(name, mtime) != mtime:
+            importlib.reload(module)
+            mtimes[name] = mtime
+
+
+class RenderDaemon:
+    def __init__(self, fork=False):
+        self.fork = fork and hasattr(os, "fork")
+        self.mtimes = {}
+        self.jobs = 0
+        self.started = time.time()
+        self.stopping = False
+
+    def warm(self):
+        """Import manim, the scenes and their helpers before the first job."""
+        os.chdir(ROOT)
+        sys.path.insert(0, str(ROOT))
+        import manim
+
+        install_cache_locks()
+        _load_scenes_module(SCENES_FILE)
+        _refresh_modules(self.mtimes)
+
+    def _render_forked(self, scene, quality, options):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                entry = render_scene(scene, quality, MEDIA_DIR, SCENES_FILE, **options)
+            except BaseException as exc:
+                entry = {"scene": scene, "ok": False, "output": None, "error": repr(exc), "seconds": 0}
+            with os.fdopen(write_fd, "w") as f:
+                json.dump(entry, f)
+            os._exit(0)
+
+        os.close(write_fd)
+        with os.fdopen(read_fd) as f:
+            data = f.read()
+        _, status = os.waitpid(pid, 0)
+        if data:
+            return json.loads(data)
+        return {"scene": scene, "ok": False, "output": None, "error": f"render process died (status {status})",
+                "seconds": 0}
+
+    def render(self, scene, quality=DEFAULT_QUALITY, **options):
+        self.jobs += 1
+        _refresh_modules(self.mtimes)
+        if self.fork:
+            return self._render_forked(scene, quality, options)
+        # render_scene catches the scene's exceptions and reports them in the entry
+        return render_scene(scene, quality, MEDIA_DIR, SCENES_FILE, **options)
+
+    def dispatch(self, request):
+        command = request.get("command", "render")
+        if command == "render":
+            options = request.get("options", {})
+            if not isinstance(options, dict):
+                return {"ok": False, "error": "bad request: options must be an object"}
+            unknown = set(options) - CLIENT_OPTIONS
+            if unknown:
+                return {"ok": False, "error": f"bad request: unknown options {', '.join(sorted(unknown))}"}
+            if not all(isinstance(value, bool) for value in options.values()):
+                return {"ok": False, "error": "bad request: options must be true or false"}
+            return self.render(request["scene"], request.get("quality", DEFAULT_QUALITY), **options)
+        if command == "ping":
+            return {"ok": True, "jobs": self.jobs, "uptime": round(time.time() - self.started, 1), "fork": self.fork}
+        if command == "stop":
+            self.stopping = True
+            return {"ok": True}
+        return {"ok": False, "error": f"unknown command {command!r}"}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # One JSON request per line, one JSON response per line
+        for line in self.rfile:
+            try:
+                response = self.server.render_daemon.dispatch(json.loads(line))
+            except (ValueError, KeyError, TypeError) as exc:
+                response = {"ok": False, "error": f"bad request: {exc}"}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+            if self.server.render_daemon.stopping:
+                return
+
+
+def serve(fork=False):
+    """Warm up, then serve jobs until a stop request."""
+    if is_running():
+        raise RuntimeError("a render daemon is already running")
+    daemon = RenderDaemon(fork)
+    daemon.warm()
+    if UNIX:
+        SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+        SOCKET_PATH.unlink(missing_ok=True)  # left over from a daemon that was killed
+        server = socketserver.UnixStreamServer(str(SOCKET_PATH), _Handler)
+    else:
+        server = socketserver.TCPServer(TCP_ADDRESS, _Handler)
+    server.render_daemon = daemon
+    print(f"Render daemon ready on {SOCKET_PATH if UNIX else TCP_ADDRESS}", flush=True)
+    try:
+        with server:
+            while not daemon.stopping:
+                server.handle_request()
+    finally:
+        if UNIX:
+            SOCKET_PATH.unlink(missing_ok=True)
+
+
+def _connect():
+    if UNIX:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(SOCKET_PATH))
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    return socket.create_connection(TCP_ADDRESS)
+
+
+def request(payload):
+    """Send one request to the daemon and return its response."""
+    with _connect() as sock, sock.makefile("rwb") as f:
+        f.write(json.dumps(payload).encode() + b"\n")
+        f.flush()
+        line = f.readline()
+    if not line:
+        raise ConnectionError("render daemon closed the connection")
+    return json.loads(line)
+
+
+def render(scene, quality=DEFAULT_QUALITY, **options):
+    """Render a scene in the daemon and return its render.py manifest entry."""
+    return request({"command": "render", "scene": scene, "quality": quality, "options": options})
+
+
+def is_running():
+    try:
+        return request({"command": "ping"})["ok"]
+    except OSError:
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm manim render daemon")
+    sub = parser.add_subparsers(dest="command", required=True)
+    start = sub.add_parser("start", help="run the daemon in the foreground")
+    start.add_argument("--fork", action="store_true", help="render each job in a forked process")
+    job = sub.add_parser("render", help="render scenes through the running daemon")
+    job.add_argument("scenes", nargs="+")
+    job.add_argument("--quality", default=DEFAULT_QUALITY, help="manim quality, e.g. low_quality")
+    sub.add_parser("status", help="check whether the daemon is running")
+    sub.add_parser("stop", help="stop the daemon after its current job")
+    args = parser.parse_args(argv)
+
+    if args.command == "start":
+        serve(args.fork)
+        return 0
+    try:
+        if args.command == "render":
+            failed = 0
+            for scene in args.scenes:
+                start_time = time.perf_counter()
+                entry = render(scene, args.quality)
+                status = f"ok  {entry['output']}" if entry["ok"] else f"FAILED ({entry['error']})"
+                print(f"{scene:<24} {time.perf_counter() - start_time:>8.1f}s  {status}", flush=True)
+                failed += not entry["ok"]
+            return 1 if failed else 0
+        print(request({"command": "ping" if args.command == "status" else "stop"}))
+    except OSError:
+        print("No render daemon running; start one with: python render_daemon.py start")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""
+Local simulation service for dashboards that need win-rate estimates.
+
+A small asyncio HTTP/1.1 server (TCP or Unix socket) in front of the batch
+engine. Simulations run in a process pool, so the event loop only parses
+requests and writes responses. Identical seeded requests that arrive while
+one is running share its result, and finished results are kept in an LRU
+cache bounded by the total size of the cached responses. Requests without a
+seed are fresh draws and are never shared or cached.
+
+    python service.py --port 8314
+    curl 'http://127.0.0.1:8314/simulate?doors=3&trials=1e6&seed=1&strategy=switch'
+    curl 'http://127.0.0.1:8314/stats'
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from simulation import simulate, simulate_strategy
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8314
+DEFAULT_CACHE_BYTES = 16 << 20
+MAX_TRIALS = 10**9
+STRATEGIES = ("switch", "stay", "both")
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class ResultCache:
+    """LRU cache of response bodies, evicting until the total size fits in `max_bytes`."""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+
+    def get(self, key):
+        body = self.entries.get(key)
+        if body is not None:
+            self.entries.move_to_end(key)
+        return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self.entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+def parse_job(query):
+    """(doors, trials, seed, strategy, opened) from query parameters; raises ValueError."""
+    params = {k: v[-1] for k, v in parse_qs(query).items()}
+    doors = int(params.get("doors", 3))
+    trials = float(params.get("trials", 1e5))
+    if not math.isfinite(trials):
+        raise ValueError("trials must be a finite number")
+    trials = int(trials)
+    seed = int(params["seed"]) if "seed" in params else None
+    strategy = params.get("strategy", "both")
+    opened = int(params.get("opened", 1))
+    if doors < 3:
+        raise ValueError("doors must be at least 3")
+    if not 1 <= trials <= MAX_TRIALS:
+        raise ValueError(f"trials must be between 1 and {MAX_TRIALS}")
+    if seed is not None and seed < 0:
+        raise ValueError("seed must be non-negative")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"strategy must be one of {', '.join(STRATEGIES)}")
+    if not 1 <= opened <= doors - 2:
+        raise ValueError(f"host must open between 1 and {doors - 2} doors")
+    return doors, trials, seed, strategy, opened
+
+
+def run_job(job):
+    """Run one job in a worker process and return its JSON-ready result."""
+    doors, trials, seed, strategy, opened = job
+    start = time.perf_counter()
+    if strategy == "both":
+        result = simulate(doors, trials, seed, opened=opened)
+        wins = {"switch": result.switch_wins, "stay": result.stay_wins}
+    else:
+        wins = {strategy: simulate_strategy(doors, trials, strategy == "switch", seed, opened=opened)}
+    return {
+        "doors": doors,
+        "trials": trials,
+        "seed": seed,
+        "opened": opened,
+        "wins": wins,
+        "win_rates": {name: w / trials for name, w in wins.items()},
+        "seconds": round(time.perf_counter() - start, 6),
+    }
+
+
+class SimulationService:
+    def __init__(self, workers=None, cache_bytes=DEFAULT_CACHE_BYTES):
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.cache = ResultCache(cache_bytes)
+        self.inflight = {}
+        self.stats = Counter()
+
+    async def _run(self, job):
+        self.stats["jobs"] += 1
+        result = await asyncio.get_running_loop().run_in_executor(self.pool, run_job, job)
+        body = json.dumps(result).encode()
+        if job[2] is not None:
+            self.cache.put(job, body)
+        return body
+
+    async def simulate(self, job):
+        """Response body for a job: cached, shared with an identical running job, or freshly run."""
+        self.stats["requests"] += 1
+        seeded = job[2] is not None
+        if seeded:
+            body = self.cache.get(job)
+            if body is not None:
+                self.stats["cache_hits"] += 1
+                return body
+
+        task = self.inflight.get(job)
+        if task is None:
+            task = asyncio.ensure_future(self._run(job))
+            if seeded:
+                self.inflight[job] = task
+                task.add_done_callback(lambda _: self.inflight.pop(job, None))
+        else:
+            self.stats["coalesced"] += 1
+        # Shielded so a client that disconnects does not cancel a shared job
+        return await asyncio.shield(task)
+
+    def stats_body(self):
+        stats = dict(self.stats, cache_entries=len(self.cache.entries), cache_bytes=self.cache.size,
+                     inflight=len(self.inflight))
+        return json.dumps(stats).encode()
+
+    async def route(self, method, target):
+        url = urlsplit(target)
+        if method != "GET":
+            return 400, json.dumps({"error": "only GET is supported"}).encode()
+        if url.path == "/stats":
+            return 200, self.stats_body()
+        if url.path != "/simulate":
+            return 404, json.dumps({"error": f"unknown path {url.path}"}).encode()
+        try:
+            job = parse_job(url.query)
+        except (ValueError, KeyError) as exc:
+            return 400, json.dumps({"error": str(exc)}).encode()
+        try:
+            return 200, await self.simulate(job)
+        except Exception as exc:
+            self.stats["errors"] += 1
+            return 500, json.dumps({"error": f"{type(exc).__name__}: {exc}"}).encode()
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection, with keep-alive."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, target, version = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                status, body = await self.route(method, target)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError):
+            pass  # Client went away or sent garbage
+        finally:
+            writer.close()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None, workers=None, cache_bytes=DEFAULT_CACHE_BYTES):
+    service = SimulationService(workers, cache_bytes)
+    if unix:
+        server = await asyncio.start_unix_server(service.handle, path=unix)
+        print(f"Listening on {unix}", flush=True)
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+        print(f"Listening on http://{host}:{port}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+async def _read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _client(host, port, paths, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in paths:
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+            await writer.drain()
+            status, _ = await _read_response(reader)
+            if status != 200:
+                raise RuntimeError(f"{path} returned {status}")
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def fetch(host, port, path):
+    """One GET request; returns the decoded JSON body."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        return json.loads((await _read_response(reader))[1])
+    finally:
+        writer.close()
+
+
+async def load_test(host=DEFAULT_HOST, port=DEFAULT_PORT, requests=2000, concurrency=32, distinct=50,
+                    doors=3, trials=10**5, seed=0):
+    """Fire `requests` simulate calls from `concurrency` keep-alive clients.
+
+    Each call uses one of `distinct` seeds, so the mix of cache hits, shared
+    in-flight jobs and fresh runs is set by requests / distinct. Returns
+    throughput and latency percentiles.
+    """
+    rng = random.Random(seed)
+    paths = [
+        f"/simulate?doors={doors}&trials={trials}&seed={rng.randrange(distinct)}&strategy=both"
+        for _ in range(requests)
+    ]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, paths[i::concurrency], latencies) for i in range(concurrency)))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(q):
+        return round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1e3, 3)
+
+    return {
+        "requests": len(latencies),
+        "seconds": round(seconds, 3),
+        "req_per_sec": round(len(latencies) / seconds, 1),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(latencies[-1] * 1e3, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Monty Hall simulation service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--cache-mb", type=float, default=DEFAULT_CACHE_BYTES / 2**20, help="result cache size")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers, int(args.cache_mb * 2**20)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""
+Batched Monty Hall simulation engine.
+
+Mirrors MontyHall::playSingleSimulation from monty_hall.cpp, but draws the
+prize doors, initial picks and host reveals of a whole chunk of trials as
+NumPy arrays instead of looping one trial at a time. Memory use is bounded
+by the chunk size, not by the number of trials, and no per-door state is
+ever built, so the cost of a trial does not grow with the door count.
+"""
+
+import math
+from dataclasses import dataclass
+from statistics import NormalDist
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+DEFAULT_MAX_TRIALS = 10**9
+MIN_ADAPTIVE_BATCH = 1000
+
+
+@dataclass
+class SimulationResult:
+    doors: int
+    trials: int
+    switch_wins: int
+    stay_wins: int
+    opened: int = 1
+
+    @property
+    def switch_rate(self):
+        return self.switch_wins / self.trials if self.trials else 0.0
+
+    @property
+    def stay_rate(self):
+        return self.stay_wins / self.trials if self.trials else 0.0
+
+    def __add__(self, other):
+        if (self.doors, self.opened) != (other.doors, other.opened):
+            raise ValueError("cannot merge results for different games")
+        return SimulationResult(
+            self.doors,
+            self.trials + other.trials,
+            self.switch_wins + other.switch_wins,
+            self.stay_wins + other.stay_wins,
+            self.opened,
+        )
+
+
+@dataclass
+class PairedResult:
+    """Both strategies scored on the same prize, pick and reveal draws."""
+
+    doors: int
+    trials: int
+    switch_wins: int
+    stay_wins: int
+    switch_only: int
+    stay_only: int
+    opened: int = 1
+
+    @property
+    def difference(self):
+        """Mean per-trial (switch win - stay win)."""
+        return (self.switch_only - self.stay_only) / self.trials if self.trials else 0.0
+
+    @property
+    def variance(self):
+        """Sample variance of the per-trial difference."""
+        n = self.trials
+        if n < 2:
+            return 0.0
+        # Each difference is -1, 0 or 1, so its square is 1 exactly on discordant trials
+        return (self.switch_only + self.stay_only - n * self.difference**2) / (n - 1)
+
+    @property
+    def independent_variance(self):
+        """Per-trial variance of the difference had the strategies been run independently."""
+        if not self.trials:
+            return 0.0
+        p = self.switch_wins / self.trials
+        q = self.stay_wins / self.trials
+        return p * (1 - p) + q * (1 - q)
+
+    @property
+    def std_error(self):
+        return math.sqrt(self.variance / self.trials) if self.trials else 0.0
+
+    def interval(self, confidence=0.95):
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        return self.difference - z * self.std_error, self.difference + z * self.std_error
+
+    def __add__(self, other):
+        if (self.doors, self.opened) != (other.doors, other.opened):
+            raise ValueError("cannot merge results for different games")
+        return PairedResult(
+            self.doors,
+            self.trials + other.trials,
+            self.switch_wins + other.switch_wins,
+            self.stay_wins + other.stay_wins,
+            self.switch_only + other.switch_only,
+            self.stay_only + other.stay_only,
+            self.opened,
+        )
+
+
+@dataclass
+class Estimate:
+    trials: int
+    wins: int
+    low: float
+    high: float
+
+    @property
+    def rate(self):
+        return self.wins / self.trials if self.trials else 0.0
+
+    @property
+    def half_width(self):
+        return (self.high - self.low) / 2
+
+
+@dataclass
+class AdaptiveResult:
+    doors: int
+    precision: float
+    confidence: float
+    switch: Estimate
+    stay: Estimate
+    opened: int = 1
+
+
+def wilson_interval(wins, trials, z):
+    """Wilson score interval for a win rate, computed from running counts."""
+    if trials == 0:
+        return 0.0, 1.0
+    denom = trials + z * z
+    center = (wins + z * z / 2) / denom
+    half = z / denom * math.sqrt(wins * (trials - wins) / trials + z * z / 4)
+    return max(center - half, 0.0), min(center + half, 1.0)
+
+
+def _skip(r, a, b):
+    # Map r, uniform over the doors other than a and b, onto a door index.
+    lo = np.minimum(a, b)
+    hi = np.maximum(a, b)
+    r += r >= lo
+    r += (r >= hi) & (hi != lo)
+    return r
+
+
+def reveal_and_switch(doors, prize, pick, rng):
+    """Draw the host's reveal and the switch target for rounds with one door opened."""
+    # Monty opens one goat door that is neither the prize nor the pick
+    candidates = doors - 2 + (prize == pick)
+    reveal = _skip(rng.integers(0, candidates, dtype=np.int32), prize, pick)
+
+    # Switching moves to one of the other closed doors
+    target = _skip(rng.integers(0, doors - 2, len(prize), dtype=np.int32), pick, reveal)
+    return reveal, target
+
+
+def _switch_wins(doors, prize, pick, rng, opened):
+    # Boolean array: does switching win each of these rounds?
+    size = len(prize)
+    if opened > 1:
+        # Only the pick, the prize and the switch target matter. The target is
+        # one of the doors - 1 - opened closed doors and, if the pick missed,
+        # the car is always among them; draw the target's slot and let slot 0
+        # stand for the car.
+        slot = rng.integers(0, doors - 1 - opened, size, dtype=np.int32)
+        return (prize != pick) & (slot == 0)
+
+    reveal, target = reveal_and_switch(doors, prize, pick, rng)
+    return target == prize
+
+
+def play_chunk(doors, size, rng, switch, opened=1):
+    """Play `size` rounds with one strategy and return the number of wins.
+
+    The host opens `opened` goat doors: 1 like playSingleSimulation, or
+    doors - 2 like runInteractiveGame.
+    """
+    prize = rng.integers(0, doors, size, dtype=np.int32)
+    pick = rng.integers(0, doors, size, dtype=np.int32)
+    if not switch:
+        # The host's reveal cannot change the outcome of staying
+        return int(np.count_nonzero(prize == pick))
+    return int(np.count_nonzero(_switch_wins(doors, prize, pick, rng, opened)))
+
+
+def play_paired_chunk(doors, size, rng, opened=1):
+    """Play `size` rounds once and score both strategies on them.
+
+    Returns (switch_wins, stay_wins, switch_only, stay_only).
+    """
+    prize = rng.integers(0, doors, size, dtype=np.int32)
+    pick = rng.integers(0, doors, size, dtype=np.int32)
+    stay = prize == pick
+    switch = _switch_wins(doors, prize, pick, rng, opened)
+    return (
+        int(np.count_nonzero(switch)),
+        int(np.count_nonzero(stay)),
+        int(np.count_nonzero(switch & ~stay)),
+        int(np.count_nonzero(stay & ~switch)),
+    )
+
+
+def _play(doors, trials, rng, switch, opened, chunk_size):
+    wins = 0
+    remaining = trials
+    while remaining > 0:
+        size = min(remaining, chunk_size)
+        wins += play_chunk(doors, size, rng, switch, opened)
+        remaining -= size
+    return wins
+
+
+def _play_until(doors, rng, switch, opened, precision, z, max_trials, chunk_size):
+    # Play batches until the interval's half-width reaches `precision`, sizing
+    # each batch from the current rate so the last one barely overshoots.
+    wins = trials = 0
+    while trials < max_trials:
+        needed = MIN_ADAPTIVE_BATCH
+        if trials:
+            low, high = wilson_interval(wins, trials, z)
+            if (high - low) / 2 <= precision:
+                break
+            p = wins / trials
+            needed = max(math.ceil(z * z * p * (1 - p) / precision**2) - trials, needed)
+        size = min(needed, chunk_size, max_trials - trials)
+        wins += play_chunk(doors, size, rng, switch, opened)
+        trials += size
+
+    low, high = wilson_interval(wins, trials, z)
+    return Estimate(trials, wins, low, high)
+
+
+def _check_game(doors, opened):
+    doors = max(doors, 3)
+    if not 1 <= opened <= doors - 2:
+        raise ValueError(f"host must open between 1 and {doors - 2} doors")
+    return doors
+
+
+def _check_adaptive(precision, confidence):
+    if not precision > 0:
+        raise ValueError("precision must be positive")
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+
+
+def simulate(doors=3, trials=1000, seed=None, rng=None, chunk_size=DEFAULT_CHUNK_SIZE, opened=1):
+    """Run `trials` rounds per strategy and return a SimulationResult.
+
+    Like MontyHall::runSimulation, the switching and staying rounds are
+    drawn independently of each other.
+    """
+    doors = _check_game(doors, opened)
+    if rng is None:
+        rng = np.random.default_rng(seed)
+
+    switch_wins = _play(doors, trials, rng, True, opened, chunk_size)
+    stay_wins = _play(doors, trials, rng, False, opened, chunk_size)
+    return SimulationResult(doors, trials, switch_wins, stay_wins, opened)
+
+
+def simulate_strategy(doors=3, trials=1000, switch=True, seed=None, rng=None, chunk_size=DEFAULT_CHUNK_SIZE, opened=1):
+    """Win count of one strategy over `trials` rounds."""
+    doors = _check_game(doors, opened)
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    return _play(doors, trials, rng, switch, opened, chunk_size)
+
+
+def simulate_paired(doors=3, trials=1000, seed=None, rng=None, chunk_size=DEFAULT_CHUNK_SIZE, opened=1):
+    """Score switching and staying on the same `trials` rounds.
+
+    Uses common random numbers: every prize, pick and reveal is drawn once
+    and shared by both strategies, which halves the random draws of two
+    independent runs. It does not shrink the variance of the difference:
+    the two strategies never both win a round, so their outcomes are
+    negatively correlated and pairing increases it (with 3 doors they are
+    perfectly anti-correlated and it doubles). Compare `variance` with
+    `independent_variance`.
+    """
+    doors = _check_game(doors, opened)
+    if rng is None:
+        rng = np.random.default_rng(seed)
+
+    counts = [0, 0, 0, 0]
+    remaining = trials
+    while remaining > 0:
+        size = min(remaining, chunk_size)
+        for i, c in enumerate(play_paired_chunk(doors, size, rng, opened)):
+            counts[i] += c
+        remaining -= size
+    return PairedResult(doors, trials, *counts, opened)
+
+
+def simulate_adaptive(
+    doors=3,
+    precision=1e-3,
+    confidence=0.95,
+    seed=None,
+    rng=None,
+    max_trials=DEFAULT_MAX_TRIALS,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    opened=1,
+):
+    """Simulate each strategy only until its win rate is known to `precision`.
+
+    Keeps running win counts per strategy and stops that strategy as soon as
+    the half-width of its Wilson interval at `confidence` is at most
+    `precision`, or after `max_trials` rounds. Returns an AdaptiveResult with
+    the trials used and the final interval for each strategy.
+    """
+    doors = _check_game(doors, opened)
+    _check_adaptive(precision, confidence)
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    switch = _play_until(doors, rng, True, opened, precision, z, max_trials, chunk_size)
+    stay = _play_until(doors, rng, False, opened, precision, z, max_trials, chunk_size)
+    return AdaptiveResult(doors, precision, confidence, switch, stay, opened)
+
+
+def format_result(result, title="Monty Hall Simulation Results"):
+    """Render a result the way MontyHall::runSimulation prints it."""
+    return (
+        f"\n=== {title} ===\n"
+        f"Number of Doors: {result.doors}\n"
+        f"Simulations per Strategy: {result.trials}\n\n"
+        f"Switched  -> Wins: {result.switch_wins}, Losses: {result.trials - result.switch_wins}\n"
+        f"Stayed    -> Wins: {result.stay_wins}, Losses: {result.trials - result.stay_wins}\n"
+    )
+
+
+def format_adaptive_result(result):
+    """Render an adaptive result like MontyHall::runAdaptiveSimulation."""
+    lines = [
+        "\n=== Adaptive Simulation Results ===",
+        f"Number of Doors: {result.doors}",
+        f"Target Precision: +/- {result.precision:.4f} ({result.confidence:.0%} confidence)\n",
+    ]
+    for name, est in (("Switched", result.switch), ("Stayed", result.stay)):
+        lines.append(
+            f"{name:<9} -> Win rate: {est.rate:.4f} [{est.low:.4f}, {est.high:.4f}]"
+            f" after {est.trials} trials"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def format_paired_result(result, confidence=0.95):
+    """Render a paired result in the runSimulation layout plus the difference."""
+    low, high = result.interval(confidence)
+    return format_result(result, "Monty Hall Paired Simulation Results") + (
+        f"\nSwitch - Stay: {result.difference:+.4f} [{low:+.4f}, {high:+.4f}]"
+        f" ({confidence:.0%} confidence)\n"
+        f"Variance of difference: {result.variance:.6f}"
+        f" (independent runs: {result.independent_variance:.6f})\n"
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    doors = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    trials = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    print(format_result(simulate(doors, trials)), end="")
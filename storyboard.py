@@ -0,0 +1,143 @@
+"""
+Storyboard export for the scenes in animations.py.
+
+Runs each scene's construct() with manim skipping every intermediate frame,
+and rasterizes only the state at the end of each self.play()/self.wait() to
+a PNG. A contact sheet per scene lays the keyframes out in order with the
+animations that led to them, so the narrative and layout can be reviewed
+without encoding any video. Scenes run in a process pool and share the
+media/Tex cache with render.py.
+
+    python storyboard.py                         # every scene
+    python storyboard.py Classic3DoorVersion MontyAdam --quality medium_quality
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from render import MEDIA_DIR, SCENES_FILE, _load_scenes_module, install_cache_locks, list_scenes
+
+STORYBOARD_DIR = MEDIA_DIR / "storyboards"
+DEFAULT_QUALITY = "low_quality"
+SHEET_COLUMNS = 5
+THUMB_WIDTH = 384
+CAPTION_HEIGHT = 28
+
+
+def _caption(args):
+    names = [type(a).__name__ for a in args if not isinstance(a, (int, float))]
+    if names and all(name == "Wait" for name in names):
+        return "wait"
+    return f"play: {', '.join(names)}" if names else "play"
+
+
+def contact_sheet(frames, path, title):
+    """Lay out (png path, caption) keyframes in a grid image at `path`."""
+    from PIL import Image, ImageDraw
+
+    first = Image.open(frames[0][0])
+    thumb_height = round(first.height * THUMB_WIDTH / first.width)
+    rows = -(-len(frames) // SHEET_COLUMNS)
+    cell_height = thumb_height + CAPTION_HEIGHT
+    sheet = Image.new("RGB", (SHEET_COLUMNS * THUMB_WIDTH, CAPTION_HEIGHT + rows * cell_height), "white")
+    draw = ImageDraw.Draw(sheet)
+    draw.text((8, 8), title, fill="black")
+    for i, (png, caption) in enumerate(frames):
+        x = (i % SHEET_COLUMNS) * THUMB_WIDTH
+        y = CAPTION_HEIGHT + (i // SHEET_COLUMNS) * cell_height
+        with Image.open(png) as image:
+            sheet.paste(image.convert("RGB").resize((THUMB_WIDTH, thumb_height)), (x, y))
+        draw.text((x + 6, y + thumb_height + 6), f"{i + 1}. {caption}"[:60], fill="black")
+    sheet.save(path)
+    return path
+
+
+def storyboard_scene(name, quality=DEFAULT_QUALITY, out_dir=STORYBOARD_DIR, media_dir=MEDIA_DIR,
+                     scenes_file=SCENES_FILE):
+    """Write one scene's keyframes and contact sheet; return a summary entry."""
+    entry = {"scene": name, "ok": False, "frames": 0, "sheet": None, "error": None}
+    start = time.perf_counter()
+    try:
+        os.chdir(Path(scenes_file).parent)
+        sys.path.insert(0, str(Path(scenes_file).parent))
+
+        from manim import tempconfig
+        from PIL import Image
+
+        install_cache_locks(media_dir)
+        module = _load_scenes_module(scenes_file)
+        scene_dir = Path(out_dir) / name
+        scene_dir.mkdir(parents=True, exist_ok=True)
+        for old in scene_dir.glob("*.png"):
+            old.unlink()
+
+        frames = []
+        settings = {"quality": quality, "media_dir": str(media_dir), "write_to_movie": False, "disable_caching": True}
+        with tempconfig(settings):
+            # Skipping makes every play() jump straight to its end state
+            scene = getattr(module, name)(skip_animations=True)
+
+            # Scene.wait() runs through self.play(Wait(...)), so play is the only hook
+            play = scene.play
+
+            def capture(*args, **kwargs):
+                result = play(*args, **kwargs)
+                scene.update_mobjects(0)
+                scene.renderer.update_frame(scene)
+                png = scene_dir / f"{len(frames) + 1:03}.png"
+                Image.fromarray(scene.renderer.get_frame()).save(png)
+                frames.append((png, _caption(args)))
+                return result
+
+            scene.play = capture
+            scene.render()
+
+        if frames:
+            entry["sheet"] = str(contact_sheet(frames, scene_dir / "contact_sheet.png", name))
+        entry["frames"] = len(frames)
+        entry["ok"] = True
+    except Exception as exc:
+        entry["error"] = f"{type(exc).__name__}: {exc}"
+    entry["seconds"] = round(time.perf_counter() - start, 3)
+    return entry
+
+
+def storyboard_all(scenes=None, quality=DEFAULT_QUALITY, workers=None, out_dir=STORYBOARD_DIR):
+    """Storyboard scenes in parallel, one fresh worker process per scene."""
+    scenes = scenes or list_scenes()
+    unknown = set(scenes) - set(list_scenes())
+    if unknown:
+        raise ValueError(f"unknown scenes: {', '.join(sorted(unknown))}")
+    workers = min(workers or os.cpu_count() or 1, len(scenes))
+
+    entries = {}
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+        futures = [pool.submit(storyboard_scene, name, quality, out_dir) for name in scenes]
+        for future in as_completed(futures):
+            entry = future.result()
+            entries[entry["scene"]] = entry
+            status = f"{entry['frames']:>4} frames" if entry["ok"] else f"FAILED ({entry['error']})"
+            print(f"{entry['scene']:<24} {entry['seconds']:>8.1f}s  {status}", flush=True)
+    return [entries[name] for name in scenes]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export keyframe storyboards of animations.py scenes")
+    parser.add_argument("scenes", nargs="*", help="scenes to export (default: all)")
+    parser.add_argument("--quality", default=DEFAULT_QUALITY, help="manim quality of the keyframes")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--output", default=str(STORYBOARD_DIR), help="output directory")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    entries = storyboard_all(args.scenes, args.quality, args.workers, args.output)
+    print(f"Wall time: {time.perf_counter() - start:.1f}s  Storyboards: {args.output}")
+    return 0 if all(e["ok"] for e in entries) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
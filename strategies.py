@@ -0,0 +1,213 @@
+"""
+Vectorized strategy plugins for the batch simulation engine.
+
+MontyHall::runSimulation only knows "always switch" and "always stay". Here a
+strategy is any callable that takes a GameBatch, the state of a whole chunk
+of rounds right after the host opened his doors, and returns one switch
+decision per round as a boolean array (or a single bool for all of them).
+It is called once per chunk, never once per round:
+
+    def switch_if_host_opened_low(games):
+        return games.reveal < games.doors // 2
+
+    evaluate(switch_if_host_opened_low, doors=3, trials=10**7)
+
+Strategies can be named on the command line: built-ins by name, factories
+as name=value, and your own as module:function.
+
+    python strategies.py always_switch switch_with_probability=0.5 mystrats:cautious --doors 3
+"""
+
+import argparse
+import importlib
+import os
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from simulation import DEFAULT_CHUNK_SIZE, _check_game, _switch_wins, reveal_and_switch
+
+
+@dataclass
+class GameBatch:
+    """State of `size` rounds after the host has opened `opened` goat doors.
+
+    Doors are 0-based indices. `reveal` is the door the host opened when he
+    opens exactly one, and None otherwise. `rng` is there for randomized strategies.
+    """
+
+    doors: int
+    opened: int
+    pick: np.ndarray
+    reveal: object
+    rng: np.random.Generator
+
+    @property
+    def size(self):
+        return len(self.pick)
+
+    @property
+    def closed(self):
+        """Closed doors a switcher can move to."""
+        return self.doors - 1 - self.opened
+
+
+@dataclass
+class StrategyResult:
+    name: str
+    doors: int
+    trials: int
+    wins: int
+    switches: int
+    opened: int = 1
+
+    @property
+    def win_rate(self):
+        return self.wins / self.trials if self.trials else 0.0
+
+    @property
+    def switch_rate(self):
+        return self.switches / self.trials if self.trials else 0.0
+
+
+STRATEGIES = {}
+# Names in STRATEGIES that are factories, called with the value of "name=value"
+FACTORIES = set()
+
+
+def register(name, factory=False):
+    """Decorator adding a strategy, or with `factory` a factory of strategies, to STRATEGIES."""
+
+    def decorator(func):
+        STRATEGIES[name] = func
+        if factory:
+            FACTORIES.add(name)
+        else:
+            FACTORIES.discard(name)
+        return func
+
+    return decorator
+
+
+@register("always_switch")
+def always_switch(games):
+    return True
+
+
+@register("always_stay")
+def always_stay(games):
+    return False
+
+
+@register("switch_with_probability", factory=True)
+def switch_with_probability(p):
+    """Factory: switch in a random fraction `p` of the rounds."""
+    p = float(p)
+
+    def strategy(games):
+        return games.rng.random(games.size) < p
+
+    return strategy
+
+
+@register("switch_if_host_opened_below", factory=True)
+def switch_if_host_opened_below(door):
+    """Factory: switch only when the host opened a door whose 0-based index is below `door`."""
+    door = int(door)
+
+    def strategy(games):
+        if games.reveal is None:
+            raise ValueError("this strategy needs a game where the host opens one door")
+        return games.reveal < door
+
+    return strategy
+
+
+@register("switch_if_doors_at_least", factory=True)
+def switch_if_doors_at_least(doors):
+    """Factory: switch only in games with at least `doors` doors."""
+    doors = int(doors)
+
+    def strategy(games):
+        return games.doors >= doors
+
+    return strategy
+
+
+def load_strategy(spec):
+    """Resolve "name", "name=value" or "module:function" to a strategy callable."""
+    if ":" in spec:
+        module, _, attr = spec.partition(":")
+        return getattr(importlib.import_module(module), attr)
+    name, sep, value = spec.partition("=")
+    if name not in STRATEGIES:
+        raise ValueError(f"unknown strategy {name!r}; known: {', '.join(sorted(STRATEGIES))}")
+    if name not in FACTORIES:
+        if sep:
+            raise ValueError(f"strategy {name!r} takes no value")
+        return STRATEGIES[name]
+    if not value:
+        raise ValueError(f"strategy {name!r} needs a value, e.g. {name}=1")
+    strategy = STRATEGIES[name](value)
+    strategy.__name__ = spec
+    return strategy
+
+
+def play_strategy_chunk(strategy, doors, size, rng, opened=1):
+    """Play `size` rounds with `strategy`; return (wins, switches)."""
+    prize = rng.integers(0, doors, size, dtype=np.int32)
+    pick = rng.integers(0, doors, size, dtype=np.int32)
+    if opened == 1:
+        # Drawn here rather than in _switch_wins, since strategies may look at the reveal
+        reveal, target = reveal_and_switch(doors, prize, pick, rng)
+        switch_wins = target == prize
+    else:
+        reveal = None
+        switch_wins = _switch_wins(doors, prize, pick, rng, opened)
+
+    decision = np.broadcast_to(np.asarray(strategy(GameBatch(doors, opened, pick, reveal, rng)), dtype=bool), (size,))
+    won = np.where(decision, switch_wins, prize == pick)
+    return int(np.count_nonzero(won)), int(np.count_nonzero(decision))
+
+
+def evaluate(strategy, doors=3, trials=1000, seed=None, rng=None, chunk_size=DEFAULT_CHUNK_SIZE, opened=1, name=None):
+    """Play `trials` rounds with a strategy and return a StrategyResult."""
+    doors = _check_game(doors, opened)
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    wins = switches = 0
+    for start in range(0, trials, chunk_size):
+        w, s = play_strategy_chunk(strategy, doors, min(chunk_size, trials - start), rng, opened)
+        wins += w
+        switches += s
+    return StrategyResult(name or getattr(strategy, "__name__", "strategy"), doors, trials, wins, switches, opened)
+
+
+def format_results(results):
+    lines = [f"{'strategy':<36} {'doors':>6} {'opened':>7} {'switched':>9} {'win rate':>9}"]
+    for r in results:
+        lines.append(f"{r.name:<36} {r.doors:>6} {r.opened:>7} {r.switch_rate:>9.2%} {r.win_rate:>9.4f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate Monty Hall strategies")
+    parser.add_argument("strategies", nargs="+", help='"name", "name=value" or "module:function"')
+    parser.add_argument("--doors", type=int, default=3, help="number of doors (minimum 3)")
+    parser.add_argument("--opened", type=int, default=1, help="goat doors the host opens")
+    parser.add_argument("--trials", type=float, default=1e6, help="rounds per strategy")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible runs")
+    args = parser.parse_args(argv)
+
+    # Let module:function find plugin modules in the current directory
+    sys.path.insert(0, os.getcwd())
+    results = [
+        evaluate(load_strategy(spec), args.doors, int(args.trials), args.seed, opened=args.opened, name=spec)
+        for spec in args.strategies
+    ]
+    print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()
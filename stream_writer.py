@@ -0,0 +1,165 @@
+"""
+Single-stream encoding for scenes made of many short animations.
+
+manim's SceneFileWriter encodes every play()/wait() into its own partial
+movie file and joins them with a concat pass at the end. For scenes such as
+ProbabilityVsN (about 100 plays of 0.08s each) the encoder start-up, the
+per-file container overhead and the concat pass cost more than drawing the
+frames. SingleStreamFileWriter pipes every frame of a scene into one ffmpeg
+process that writes the final movie directly: no partial files, no concat.
+
+The frames handed to the encoder are exactly the frames the normal writer
+would encode (render with frame_digest=True to compare digests). The
+encoder settings match manim's partial movie files, and sound is muxed in
+afterwards. There is no per-animation cache, so every animation is
+rendered on every run; render.py skips unchanged scenes as a whole instead.
+
+    scene = make_scene(ProbabilityVsN)
+    scene.render()
+"""
+
+import hashlib
+import subprocess
+from pathlib import Path
+
+import numpy as np
+from manim import config, logger
+from manim.renderer.cairo_renderer import CairoRenderer
+from manim.scene.scene_file_writer import SceneFileWriter
+from manim.utils.file_ops import is_gif_format, write_to_movie
+
+
+def _encoder_args():
+    # Same codecs and quality as manim's partial movie files
+    if config.transparent and config.movie_file_extension == ".webm":
+        return ["-c:v", "libvpx-vp9", "-pix_fmt", "yuva420p", "-auto-alt-ref", "0"]
+    if config.transparent:
+        return ["-c:v", "qtrle", "-pix_fmt", "argb"]
+    if config.movie_file_extension == ".webm":
+        return ["-c:v", "libvpx-vp9", "-pix_fmt", "yuv420p"]
+    return ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", "23", "-movflags", "+faststart"]
+
+
+class SingleStreamFileWriter(SceneFileWriter):
+    """SceneFileWriter that encodes a whole scene in one ffmpeg session.
+
+    GIFs and scenes with sections use the normal partial-file path, which
+    they need. Sound added with add_sound() is muxed into the finished
+    stream in a second ffmpeg pass that copies the video.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.streaming = write_to_movie() and not is_gif_format() and not config.save_sections
+        self.encoder = None
+        self.temp_path = None
+        self.frames_written = 0
+
+    def _open_encoder(self):
+        movie_path = Path(self.movie_file_path)
+        movie_path.parent.mkdir(parents=True, exist_ok=True)
+        self.temp_path = movie_path.with_name(f"{movie_path.stem}.streaming{movie_path.suffix}")
+        command = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgba",
+            "-s", f"{config.pixel_width}x{config.pixel_height}",
+            "-r", str(config.frame_rate),
+            "-i", "-",
+            "-an", *_encoder_args(),
+            str(self.temp_path),
+        ]
+        self.encoder = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def abort(self):
+        """Kill the encoder and delete its unfinished movie."""
+        if self.encoder is not None:
+            self.encoder.kill()
+            self.encoder.wait()
+            self.encoder = None
+        if self.temp_path is not None:
+            self.temp_path.unlink(missing_ok=True)
+
+    def begin_animation(self, allow_write=False, file_path=None):
+        if not self.streaming:
+            return super().begin_animation(allow_write, file_path)
+        if allow_write and self.encoder is None:
+            self._open_encoder()
+
+    def end_animation(self, allow_write=False):
+        if not self.streaming:
+            return super().end_animation(allow_write)
+        # The encoder stays open for the next animation
+
+    def write_frame(self, frame_or_renderer, num_frames=1):
+        if not self.streaming or self.encoder is None:
+            return super().write_frame(frame_or_renderer, num_frames)
+        frame = frame_or_renderer if isinstance(frame_or_renderer, np.ndarray) else frame_or_renderer.get_frame()
+        data = np.ascontiguousarray(frame).data
+        try:
+            for _ in range(num_frames):
+                self.encoder.stdin.write(data)
+        except BaseException:
+            self.abort()
+            raise
+        self.frames_written += num_frames
+
+    def _mux_sound(self):
+        # Copy the video, encode the scene's sound track next to it
+        sound_path = self.temp_path.with_suffix(".wav")
+        muxed = self.temp_path.with_name(f"{self.temp_path.stem}.sound{self.temp_path.suffix}")
+        audio_codec = "libopus" if config.movie_file_extension == ".webm" else "aac"
+        try:
+            self.audio_segment.export(sound_path, format="wav")
+            subprocess.run(
+                ["ffmpeg", "-y", "-loglevel", "error", "-i", str(self.temp_path), "-i", str(sound_path),
+                 "-map", "0:v", "-map", "1:a", "-c:v", "copy", "-c:a", audio_codec, str(muxed)],
+                check=True,
+            )
+            muxed.replace(self.temp_path)
+        finally:
+            sound_path.unlink(missing_ok=True)
+            muxed.unlink(missing_ok=True)
+
+    def combine_to_movie(self):
+        if not self.streaming:
+            return super().combine_to_movie()
+        if self.encoder is None:
+            logger.info("No animations in this scene; no movie written")
+            return
+        try:
+            self.encoder.stdin.close()
+            if self.encoder.wait() != 0:
+                raise RuntimeError(f"ffmpeg exited with code {self.encoder.returncode}")
+            self.encoder = None
+            if self.includes_sound:
+                self._mux_sound()
+        except BaseException:
+            self.abort()
+            raise
+        self.temp_path.replace(self.movie_file_path)
+        logger.info(f"Streamed {self.frames_written} frames to {self.movie_file_path}")
+
+
+def make_scene(scene_class):
+    """An instance of `scene_class` that renders through SingleStreamFileWriter."""
+    # Without partial files there is nothing to look up in manim's cache
+    config.disable_caching = True
+    renderer = CairoRenderer(file_writer_class=SingleStreamFileWriter, camera_class=scene_class.camera_class)
+    return scene_class(renderer=renderer)
+
+
+def add_frame_digest(scene):
+    """Hash every frame `scene` writes; returns the hashlib object, read it after render()."""
+    writer = scene.renderer.file_writer
+    digest = hashlib.sha256()
+    write_frame = writer.write_frame
+
+    def hashed(frame_or_renderer, num_frames=1):
+        frame = frame_or_renderer if isinstance(frame_or_renderer, np.ndarray) else frame_or_renderer.get_frame()
+        data = np.ascontiguousarray(frame).data
+        for _ in range(num_frames):
+            digest.update(data)
+        return write_frame(frame_or_renderer, num_frames)
+
+    writer.write_frame = hashed
+    return digest
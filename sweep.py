@@ -0,0 +1,197 @@
+"""
+Parallel parameter sweeps with a persistent columnar results store.
+
+A sweep is a grid of doors x doors opened by the host x strategy x trials.
+Points run across a process pool, each from its own seed derived from the
+point and the sweep's root seed, so a point's result never depends on the
+schedule. Points already in the store are skipped, so an interrupted or
+extended sweep only runs what is missing.
+
+The store is a directory with one raw little-endian file per column and a
+small meta.json holding the row count. Readers memory-map the columns, so
+scenes such as ProbabilityVsN can plot stored points without simulating.
+
+    python sweep.py --doors 3 10 100 1000 --opened 1 max --trials 1e5 1e6
+    python sweep.py --show
+"""
+
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from locks import file_lock
+from simulation import simulate_strategy
+
+STORE_DIR = Path(__file__).resolve().parent / "sweep_store"
+META_FILE = "meta.json"
+LOCK_FILE = "store.lock"
+COLUMNS = {
+    "doors": "<u4",
+    "opened": "<u4",
+    "switch": "u1",
+    "trials": "<u8",
+    "seed": "<u8",
+    "wins": "<u8",
+}
+KEY_COLUMNS = ("doors", "opened", "switch", "trials", "seed")
+# Completed points are written to the store in batches of this many
+FLUSH_EVERY = 64
+
+
+class SweepStore:
+    """Append-only columnar store of sweep points.
+
+    Columns are appended first and the row count in meta.json is replaced
+    last, so a crash mid-append leaves only ignored bytes past the count.
+    Appends hold a lock on the store, so parallel sweeps can share it.
+    """
+
+    def __init__(self, path=STORE_DIR):
+        self.path = Path(path)
+        self.count = self._stored_count()
+
+    def _stored_count(self):
+        try:
+            return json.loads((self.path / META_FILE).read_text())["count"]
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    def column(self, name):
+        """One column as a read-only memory map (an empty array for an empty store)."""
+        dtype = np.dtype(COLUMNS[name])
+        file = self.path / f"{name}.bin"
+        if self.count == 0 or not file.exists():
+            return np.empty(0, dtype=dtype)
+        return np.memmap(file, dtype=dtype, mode="r", shape=(self.count,))
+
+    def columns(self):
+        return {name: self.column(name) for name in COLUMNS}
+
+    def keys(self):
+        """Set of stored (doors, opened, switch, trials, seed) points."""
+        cols = [self.column(name).tolist() for name in KEY_COLUMNS]
+        return set(zip(*cols))
+
+    def append(self, rows):
+        """Append rows, each a dict with one value per column."""
+        if not rows:
+            return
+        with file_lock(self.path / LOCK_FILE):
+            # Another sweep may have appended since this store was opened
+            self.count = self._stored_count()
+            for name, dtype in COLUMNS.items():
+                with open(self.path / f"{name}.bin", "ab") as f:
+                    # Drop anything a crashed append left past the count
+                    f.truncate(self.count * np.dtype(dtype).itemsize)
+                    np.array([row[name] for row in rows], dtype=dtype).tofile(f)
+            self.count += len(rows)
+            tmp = self.path / (META_FILE + ".tmp")
+            tmp.write_text(json.dumps({"count": self.count, "columns": COLUMNS}))
+            os.replace(tmp, self.path / META_FILE)
+
+    def win_rates(self, switch=True, all_but_one=False, opened=None):
+        """(doors, win rate) arrays for one strategy, pooled over trials and seeds.
+
+        With `all_but_one`, only points where the host opened doors - 2
+        doors are used; otherwise only those with `opened` doors, if given.
+        """
+        cols = self.columns()
+        mask = cols["switch"] == int(switch)
+        if all_but_one:
+            mask &= cols["opened"] == cols["doors"] - 2
+        elif opened is not None:
+            mask &= cols["opened"] == opened
+        doors, inverse = np.unique(cols["doors"][mask], return_inverse=True)
+        wins = np.bincount(inverse, weights=cols["wins"][mask], minlength=len(doors))
+        trials = np.bincount(inverse, weights=cols["trials"][mask], minlength=len(doors))
+        return doors, wins / np.maximum(trials, 1)
+
+
+def point_seed(seed, doors, opened, switch, trials):
+    """Seed sequence of one grid point, independent of the rest of the grid."""
+    return np.random.SeedSequence([seed, doors, opened, int(switch), trials])
+
+
+def plan_grid(doors, opened, strategies, trials, seed=0):
+    """Valid grid points as (doors, opened, switch, trials, seed) tuples.
+
+    `opened` values are counts or "max" for all but one of the other doors;
+    counts the game does not allow for a door count are left out.
+    """
+    points = {}
+    for d, o, s, t in itertools.product(doors, opened, strategies, trials):
+        o = d - 2 if o == "max" else int(o)
+        if d >= 3 and 1 <= o <= d - 2:
+            points[(d, o, s == "switch", int(t), seed)] = None
+    return list(points)
+
+
+def _run_point(point):
+    doors, opened, switch, trials, seed = point
+    rng = np.random.default_rng(point_seed(seed, doors, opened, switch, trials))
+    wins = simulate_strategy(doors, trials, switch, rng=rng, opened=opened)
+    return dict(zip(KEY_COLUMNS, point), wins=wins)
+
+
+def run_sweep(doors, opened=(1,), strategies=("switch", "stay"), trials=(10**5,), seed=0, workers=None, store=None):
+    """Run every grid point missing from the store; return (run, skipped) counts."""
+    store = store or SweepStore()
+    points = plan_grid(doors, opened, strategies, trials, seed)
+    done = store.keys()
+    pending = [p for p in points if p not in done]
+    # Largest points first so one big point does not run alone at the end
+    pending.sort(key=lambda p: -p[3])
+    workers = min(workers or os.cpu_count() or 1, max(len(pending), 1))
+
+    batch = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(_run_point, p) for p in pending]):
+            batch.append(future.result())
+            if len(batch) >= FLUSH_EVERY:
+                store.append(batch)
+                batch = []
+    store.append(batch)
+    return len(pending), len(points) - len(pending)
+
+
+def format_store(store):
+    cols = store.columns()
+    lines = [f"{'doors':>8} {'opened':>7} {'strategy':>9} {'trials':>12} {'seed':>6} {'win rate':>9}"]
+    order = np.lexsort((cols["trials"], cols["switch"], cols["opened"], cols["doors"]))
+    for i in order:
+        strategy = "switch" if cols["switch"][i] else "stay"
+        rate = cols["wins"][i] / cols["trials"][i]
+        lines.append(
+            f"{cols['doors'][i]:>8} {cols['opened'][i]:>7} {strategy:>9} {cols['trials'][i]:>12} "
+            f"{cols['seed'][i]:>6} {rate:>9.4f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel Monty Hall parameter sweeps")
+    parser.add_argument("--doors", type=int, nargs="+", default=[3, 10, 100], help="door counts")
+    parser.add_argument("--opened", nargs="+", default=["1"], help='doors the host opens, or "max"')
+    parser.add_argument("--strategy", nargs="+", choices=["switch", "stay"], default=["switch", "stay"])
+    parser.add_argument("--trials", type=float, nargs="+", default=[1e5], help="trials per point")
+    parser.add_argument("--seed", type=int, default=0, help="root seed of the sweep")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--store", default=str(STORE_DIR), help="store directory")
+    parser.add_argument("--show", action="store_true", help="print the stored points and exit")
+    args = parser.parse_args(argv)
+
+    store = SweepStore(args.store)
+    if args.show:
+        print(format_store(store))
+        return
+    run, skipped = run_sweep(args.doors, args.opened, args.strategy, args.trials, args.seed, args.workers, store)
+    print(f"Ran {run} points, skipped {skipped} already stored. Store: {store.path} ({store.count} points)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Per-trial trace files produced by the batch simulation engine.
+
+A trace is a small header followed by fixed-width records (prize, pick,
+reveal, strategy, outcome), written chunk by chunk so it never has to fit in
+memory. Every BLOCK_SIZE records the writer also stores cumulative win
+counts in a sidecar index, so a reader can jump to the running totals at any
+trial by reading at most one block of records.
+
+    python trial_trace.py write monty.trace --doors 3 --trials 1e8 --seed 1
+"""
+
+import argparse
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from simulation import DEFAULT_CHUNK_SIZE, reveal_and_switch
+
+TRACE_MAGIC = b"MHTRACE1"
+HEADER = struct.Struct("<8sII")  # magic, doors, reserved
+BLOCK_SIZE = 1 << 16
+
+TRACE_DTYPE = np.dtype(
+    [("prize", "<u4"), ("pick", "<u4"), ("reveal", "<u4"), ("strategy", "u1"), ("won", "u1")]
+)
+STAY, SWITCH = 0, 1
+
+# Cumulative counts at the start of each block: switch trials/wins, stay trials/wins
+INDEX_DTYPE = np.dtype("<u8")
+INDEX_FIELDS = 4
+
+
+def index_path(path):
+    return Path(str(path) + ".idx")
+
+
+def write_trace(path, doors=3, trials=1000, seed=None, rng=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Simulate `trials` rounds and stream them to a trace file.
+
+    Rounds alternate between switching (even rows) and staying (odd rows),
+    like runSimulation's two strategies interleaved. The host opens one goat
+    door per round.
+    """
+    doors = max(doors, 3)
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    # Chunks are whole blocks so the index can be written as we go
+    chunk_size = max(BLOCK_SIZE, chunk_size // BLOCK_SIZE * BLOCK_SIZE)
+
+    totals = np.zeros(INDEX_FIELDS, dtype=INDEX_DTYPE)
+    with open(path, "wb") as out, open(index_path(path), "wb") as idx:
+        out.write(HEADER.pack(TRACE_MAGIC, doors, 0))
+        written = 0
+        while written < trials:
+            size = min(chunk_size, trials - written)
+            prize = rng.integers(0, doors, size, dtype=np.int32)
+            pick = rng.integers(0, doors, size, dtype=np.int32)
+            reveal, target = reveal_and_switch(doors, prize, pick, rng)
+
+            rows = np.empty(size, dtype=TRACE_DTYPE)
+            rows["prize"] = prize
+            rows["pick"] = pick
+            rows["reveal"] = reveal
+            rows["strategy"] = (np.arange(written, written + size) % 2 == 0).astype(np.uint8)
+            switched = rows["strategy"] == SWITCH
+            rows["won"] = np.where(switched, target == prize, pick == prize)
+            rows.tofile(out)
+
+            for start in range(0, size, BLOCK_SIZE):
+                totals.tofile(idx)
+                block = rows[start:start + BLOCK_SIZE]
+                totals += _block_counts(block)
+            written += size
+
+
+def _block_counts(rows):
+    switched = rows["strategy"] == SWITCH
+    won = rows["won"].astype(bool)
+    return np.array(
+        [
+            np.count_nonzero(switched),
+            np.count_nonzero(switched & won),
+            np.count_nonzero(~switched),
+            np.count_nonzero(~switched & won),
+        ],
+        dtype=INDEX_DTYPE,
+    )
+
+
+def read_header(path):
+    """Return (doors, trials) for a trace file."""
+    with open(path, "rb") as f:
+        magic, doors, _ = HEADER.unpack(f.read(HEADER.size))
+    if magic != TRACE_MAGIC:
+        raise ValueError(f"{path} is not a Monty Hall trace")
+    trials = (Path(path).stat().st_size - HEADER.size) // TRACE_DTYPE.itemsize
+    return doors, trials
+
+
+def iter_trace(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the trace's records as structured arrays of at most `chunk_size` rows."""
+    _, trials = read_header(path)
+    with open(path, "rb") as f:
+        f.seek(HEADER.size)
+        for _ in range(0, trials, chunk_size):
+            yield np.fromfile(f, dtype=TRACE_DTYPE, count=chunk_size)
+
+
+class TraceReader:
+    """Running win counts at increasing trial positions of a trace.
+
+    Records are memory-mapped, never loaded as a whole. counts_at() reads
+    forward from the previous position, or jumps through the sidecar index
+    when that is shorter, so each call costs at most about one block.
+    """
+
+    def __init__(self, path):
+        self.doors, self.trials = read_header(path)
+        self.records = np.memmap(path, dtype=TRACE_DTYPE, mode="r", offset=HEADER.size, shape=(self.trials,))
+        idx = index_path(path)
+        self.index = None
+        if idx.exists():
+            self.index = np.memmap(idx, dtype=INDEX_DTYPE, mode="r").reshape(-1, INDEX_FIELDS)
+        self.position = 0
+        self.totals = np.zeros(INDEX_FIELDS, dtype=INDEX_DTYPE)
+
+    def counts_at(self, trial):
+        """(switch_trials, switch_wins, stay_trials, stay_wins) over the first `trial` records."""
+        trial = min(max(int(trial), 0), self.trials)
+        if trial < self.position:
+            self.position, self.totals = 0, np.zeros(INDEX_FIELDS, dtype=INDEX_DTYPE)
+
+        block = trial // BLOCK_SIZE
+        if self.index is not None and block < len(self.index) and block * BLOCK_SIZE > self.position:
+            self.position = block * BLOCK_SIZE
+            self.totals = np.array(self.index[block])
+
+        for start in range(self.position, trial, DEFAULT_CHUNK_SIZE):
+            self.totals += _block_counts(self.records[start:min(start + DEFAULT_CHUNK_SIZE, trial)])
+        self.position = trial
+        return tuple(int(x) for x in self.totals)
+
+    def rates_at(self, trial):
+        """(switch win rate, stay win rate) over the first `trial` records."""
+        switch_trials, switch_wins, stay_trials, stay_wins = self.counts_at(trial)
+        return (
+            switch_wins / switch_trials if switch_trials else 0.0,
+            stay_wins / stay_trials if stay_trials else 0.0,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monty Hall trial traces")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    write = sub.add_parser("write", help="simulate and write a trace file")
+    write.add_argument("path")
+    write.add_argument("--doors", type=int, default=3, help="number of doors (minimum 3)")
+    write.add_argument("--trials", type=float, default=1e6, help="rounds to trace")
+    write.add_argument("--seed", type=int, default=None, help="seed for a reproducible trace")
+
+    info = sub.add_parser("info", help="print a trace's final win rates")
+    info.add_argument("path")
+
+    args = parser.parse_args(argv)
+    if args.command == "write":
+        write_trace(args.path, args.doors, int(args.trials), args.seed)
+    reader = TraceReader(args.path)
+    switch_rate, stay_rate = reader.rates_at(reader.trials)
+    print(f"Doors: {reader.doors}, Trials: {reader.trials}")
+    print(f"Switch win rate: {switch_rate:.4f}, Stay win rate: {stay_rate:.4f}")
+
+
+if __name__ == "__main__":
+    main()